@@ -1,25 +1,31 @@
+import asyncio
 import logging
+import re
 import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import ContextTypes
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import bindparam, func, insert, lambda_stmt, select
+from sqlalchemy.orm import selectinload
 from zoneinfo import ZoneInfo
 
 from db.database import SessionLocal
-from db.models import User, Source, UserTopic
-from pipeline.collector import run_collection, TelegramCollector
+from db.models import User, Source, UserTopic, user_sources
+from pipeline.collector import run_collection, get_shared_collector
 from pipeline.filter import filter_messages_async
-from pipeline.summarizer import generate_summaries_async, get_user_summaries
+from pipeline.summarizer import generate_summaries_async, get_user_summaries_bulk
 from utils.monitoring import get_notifier
 from utils.user_tracker import get_user_tracker
 from utils.source_validator import validate_sources_batch, format_validation_result
 from utils.i18n import Language, detect_user_language, get_text
-from utils.text_utils import split_text_safely
-from utils.stats_tracker import get_user_stats, calculate_time_saved, format_time_duration
+from utils.text_utils import split_text_cached
+from utils.telegram_sender import send_message_limited
+from utils.stats_tracker import get_user_stats_bulk, calculate_time_saved, format_time_duration
 
 from .keyboards import (
-    get_user_language, is_admin_user, get_main_menu_keyboard, 
+    get_user_language, get_cached_user_language, get_cached_user, cache_user, is_admin_user, get_main_menu_keyboard, 
     get_testing_menu_keyboard, get_topics_menu_keyboard, 
     get_sources_menu_keyboard, get_language_selection_keyboard
 )
@@ -34,22 +40,169 @@ MAX_SOURCES_PER_USER = 40
 MAX_TOPICS_PER_USER = 20
 MAX_TOPIC_WORDS = 7
 MAX_TOPIC_CHARS = 70
+_WORD_RE = re.compile(r"\S+")
+
+KYIV_TZ = ZoneInfo("Europe/Kyiv")
+
+# Total registered users, loaded once at startup and incremented on the event loop after each registration
+_users_total = 0
+
+# Main menu actions; each maps to the "btn_<action>" translation key
+MENU_ACTIONS = (
+    "help", "manage_topics", "manage_sources", "view_settings", "change_language", "testing",
+    "add_topics", "remove_topics", "view_topics",
+    "add_sources", "remove_sources", "view_sources",
+    "back_main", "run_collection", "generate_summaries",
+)
+
+
+@lru_cache(maxsize=8)
+def _menu_actions(lang: Language) -> Dict[str, str]:
+    """Map localized main menu button labels to their action names."""
+    return {get_text(f"btn_{action}", lang): action for action in MENU_ACTIONS}
+
+
+@lru_cache(maxsize=8)
+def _back_buttons(lang: Language) -> Dict[str, str]:
+    """Map localized back button labels to the submenu they return to."""
+    return {
+        get_text('btn_back_topics', lang): "topics",
+        get_text('btn_back_sources', lang): "sources",
+    }
+
+
+@lru_cache(maxsize=8)
+def _help_text(lang: Language) -> str:
+    """Build the help message for a language once."""
+    return (
+        f"{get_text('help_title', lang)}\n\n"
+        f"{get_text('help_features', lang)}\n"
+        f"{get_text('feature_topics', lang)}\n\n"
+        f"{get_text('feature_sources', lang)}\n\n"
+        f"{get_text('feature_summaries', lang)}\n\n"
+        f"{get_text('help_how_it_works', lang)}\n"
+        f"{get_text('how_it_works_1', lang)}\n"
+        f"{get_text('how_it_works_2', lang)}\n"
+        f"{get_text('how_it_works_3', lang)}\n\n"
+        f"{get_text('help_footer', lang)}"
+    )
+
+
+@lru_cache(maxsize=8)
+def _topics_menu_text(lang: Language) -> str:
+    """Build the topics management intro for a language once."""
+    return (
+        f"{get_text('topics_management_title', lang)}\n\n"
+        f"{get_text('topics_management_desc', lang)}\n\n"
+        f"{get_text('prompt_what_to_do', lang)}"
+    )
+
+
+@lru_cache(maxsize=8)
+def _sources_menu_text(lang: Language) -> str:
+    """Build the sources management intro for a language once."""
+    return (
+        f"{get_text('sources_management_title', lang)}\n\n"
+        f"{get_text('sources_management_desc', lang)}\n\n"
+        f"{get_text('prompt_what_to_do', lang)}"
+    )
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@lru_cache(maxsize=32)
+def _no_updates_template(
+    lang: Language,
+    with_stats: bool = False,
+    has_topics: bool = False,
+    with_time_saved: bool = False,
+) -> str:
+    """Build the 'no updates' message, with format placeholders for the per-user statistics."""
+    message = _escape_braces(get_text('nothing_interesting', lang))
+    if not with_stats:
+        return message
+    
+    stats_lines = [
+        f"\n\n{_escape_braces(get_text('stats_title', lang))}",
+        f"• {_escape_braces(get_text('stats_messages_collected', lang))} {{messages_collected}}",
+    ]
+    if has_topics:
+        stats_lines.append(
+            f"• {_escape_braces(get_text('stats_messages_filtered', lang))} {{messages_filtered}} ("
+            + get_text('stats_matched_topics_suffix', lang, count="{topics_matched}")
+            + ")"
+        )
+    else:
+        stats_lines.append(f"• {_escape_braces(get_text('stats_sources_processed', lang))} {{sources_processed}}")
+    if with_time_saved:
+        stats_lines.append(
+            f"• {_escape_braces(get_text('stats_time_saved', lang))} ~{{time_saved}} ("
+            + _escape_braces(get_text('stats_vs_manual', lang))
+            + ")"
+        )
+        stats_lines.append(
+            f"• {_escape_braces(get_text('stats_efficiency', lang))} {{efficiency_ratio:.1f}}"
+            + _escape_braces(get_text('stats_efficiency_suffix', lang))
+        )
+    return message + "\n".join(stats_lines)
+
+
+# Compiled once and served from SQLAlchemy's statement cache on every lookup
+_USER_BY_TELEGRAM_ID = lambda_stmt(
+    lambda: select(User).where(User.telegram_id == bindparam("telegram_id"))
+)
+
+
+def _get_db_user(session, telegram_id: int) -> Optional[User]:
+    """Load the User row for a Telegram user id."""
+    return session.execute(_USER_BY_TELEGRAM_ID, {"telegram_id": telegram_id}).scalar_one_or_none()
+
+
+_USER_WITH_PREFS_BY_TELEGRAM_ID = lambda_stmt(
+    lambda: select(User)
+    .options(selectinload(User.sources), selectinload(User.user_topics))
+    .where(User.telegram_id == bindparam("telegram_id"))
+)
+
+
+def _get_user_with_prefs(session, telegram_id: int) -> Optional[User]:
+    """Load the User row with its sources and topics eagerly loaded."""
+    return session.execute(_USER_WITH_PREFS_BY_TELEGRAM_ID, {"telegram_id": telegram_id}).scalar_one_or_none()
+
+
+def load_users_total() -> None:
+    """Seed the registered user count from the database; called once at startup."""
+    global _users_total
+    with SessionLocal() as session:
+        _users_total = session.query(func.count(User.id)).scalar()
+
 
 def _is_valid_topic(text: str) -> bool:
-    cleaned = (text or "").strip()
-    if not cleaned:
-        return False
-    if len(cleaned) > MAX_TOPIC_CHARS:
-        return False
-    if len(cleaned.split()) > MAX_TOPIC_WORDS:
+    cleaned = text.strip() if text else ""
+    length = len(cleaned)
+    if not length or length > MAX_TOPIC_CHARS:
         return False
+    # Count words without materializing a list, stopping once the limit is exceeded
+    word_count = 0
+    for _ in _WORD_RE.finditer(cleaned):
+        word_count += 1
+        if word_count > MAX_TOPIC_WORDS:
+            return False
     return True
 
 
 def get_time_until_next_summary(lang: Language) -> str:
     """Calculate time remaining until next daily summary, localized to user's language."""
-    kyiv_tz = ZoneInfo("Europe/Kyiv")
-    now = datetime.now(kyiv_tz)
+    minute_bucket = int(datetime.now(KYIV_TZ).timestamp() // 60)
+    return _format_time_until_next_summary(minute_bucket, lang)
+
+
+@lru_cache(maxsize=64)
+def _format_time_until_next_summary(minute_bucket: int, lang: Language) -> str:
+    # Measure from the last second of the minute so the floored result matches an exact "now"
+    now = datetime.fromtimestamp(minute_bucket * 60 + 59, KYIV_TZ)
     
     # Summary runs at 18:00 Kyiv time
     summary_time = now.replace(hour=18, minute=0, second=0, microsecond=0)
@@ -57,10 +210,10 @@ def get_time_until_next_summary(lang: Language) -> str:
     if now >= summary_time:
         summary_time += timedelta(days=1)
     
-    time_diff = summary_time - now
+    remaining_seconds = (summary_time - now).total_seconds()
     
-    hours = int(time_diff.total_seconds() // 3600)
-    minutes = int((time_diff.total_seconds() % 3600) // 60)
+    hours = int(remaining_seconds // 3600)
+    minutes = int((remaining_seconds % 3600) // 60)
     
     if hours > 0:
         return f"{hours} {get_text('duration_hours', lang)} {minutes} {get_text('duration_minutes', lang)}"
@@ -68,56 +221,67 @@ def get_time_until_next_summary(lang: Language) -> str:
         return f"{minutes} {get_text('duration_minutes', lang)}"
 
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-    """Start the conversation and introduce the bot."""
-    user = update.effective_user
-    is_new_user = False
-    
+def _register_user(telegram_user) -> Tuple[int, Language, bool]:
+    """Create or refresh the User row for a Telegram user.
+
+    Returns (user id, language, whether the user is new).
+    """
+    username = telegram_user.username or str(telegram_user.id)
+    detected_lang = detect_user_language(telegram_user.language_code)
+    is_new = False
+
     with SessionLocal.begin() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
+        db_user = _get_db_user(session, telegram_user.id)
 
         if not db_user:
-            detected_lang = detect_user_language(user.language_code)
-            
             db_user = User(
-                username=user.username or str(user.id),
-                telegram_id=user.id,
-                language=detected_lang.value
+                username=username,
+                telegram_id=telegram_user.id,
+                language=detected_lang
             )
             session.add(db_user)
-            is_new_user = True
+            session.flush()
+            is_new = True
         else:
-            if db_user.telegram_id != user.id:
-                db_user.telegram_id = user.id
-            
-            current_username = user.username or str(user.id)
-            if db_user.username != current_username:
-                db_user.username = current_username
+            if db_user.telegram_id != telegram_user.id:
+                db_user.telegram_id = telegram_user.id
             
-            detected_lang = detect_user_language(user.language_code)
-            if not db_user.language or db_user.language != detected_lang.value:
-                db_user.language = detected_lang.value
+            if db_user.username != username:
+                db_user.username = username
             
-        
-        tracker = get_user_tracker()
-        if tracker:
-            tracker.update_user_activity(db_user.id)
-        
-        if is_new_user:
-            notifier = get_notifier()
-            if notifier:
-                session.flush()
-                total_users = session.query(User).count()
-                await notifier.notify_new_user(
-                    username=user.username or str(user.id),
-                    telegram_id=user.id,
-                    user_count=total_users
-                )
+            if db_user.language != detected_lang:
+                db_user.language = detected_lang
+
+    return db_user.id, db_user.language, is_new
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Start the conversation and introduce the bot."""
+    user = update.effective_user
+    username_or_id = user.username or str(user.id)
+    
+    user_id, language, is_new = await asyncio.to_thread(_register_user, user)
+    
+    tracker = get_user_tracker()
+    if tracker:
+        tracker.update_user_activity(user_id)
     
-    lang = get_user_language(user.id)
-    welcome_message = get_text('welcome_message', lang, name=user.first_name)
+    if is_new:
+        # Incremented here, on the event loop, once the registration has committed
+        global _users_total
+        _users_total += 1
+        notifier = get_notifier()
+        if notifier:
+            notifier.queue_new_user(
+                username=username_or_id,
+                telegram_id=user.id,
+                user_count=_users_total
+            )
     
-    await update.message.reply_text(welcome_message, reply_markup=get_main_menu_keyboard(user.id))
+    cache_user(user.id, user_id, language)
+    welcome_message = get_text('welcome_message', language, name=user.first_name)
+    
+    await update.message.reply_text(welcome_message, reply_markup=get_main_menu_keyboard(user.id, language))
     return CHOOSING_ACTION
 
 
@@ -125,7 +289,7 @@ async def prompt_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     """Prompt the user to press /start with a one-time keyboard in private chats."""
     user = update.effective_user
     try:
-        lang = get_user_language(user.id) if user else Language.ENGLISH
+        lang = await get_user_language(user.id) if user else Language.ENGLISH
     except Exception:
         lang = Language.ENGLISH
     keyboard = ReplyKeyboardMarkup([["/start"]], one_time_keyboard=True, resize_keyboard=True)
@@ -138,47 +302,44 @@ async def prompt_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Display help information."""
     user = update.effective_user
-    lang = get_user_language(user.id)
-    
-    help_text = (
-        f"{get_text('help_title', lang)}\n\n"
-        f"{get_text('help_features', lang)}\n"
-        f"{get_text('feature_topics', lang)}\n\n"
-        f"{get_text('feature_sources', lang)}\n\n"
-        f"{get_text('feature_summaries', lang)}\n\n"
-        f"{get_text('help_how_it_works', lang)}\n"
-        f"{get_text('how_it_works_1', lang)}\n"
-        f"{get_text('how_it_works_2', lang)}\n"
-        f"{get_text('how_it_works_3', lang)}\n\n"
-        f"{get_text('help_footer', lang)}"
-    )
+    lang = await get_user_language(user.id)
     
-    await update.message.reply_text(help_text, parse_mode='Markdown')
+    await update.message.reply_text(_help_text(lang), parse_mode='Markdown')
 
 
 async def show_language_selection(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Show language selection menu."""
     user = update.effective_user
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
     
     await update.message.reply_text(
         get_text('select_language', lang),
-        reply_markup=get_language_selection_keyboard(user.id),
+        reply_markup=get_language_selection_keyboard(user.id, lang),
         parse_mode='Markdown'
     )
     return SELECTING_LANGUAGE
 
 
+def _set_user_language(telegram_id: int, language: Language) -> Optional[int]:
+    """Persist the user's language; returns the user id, or None if the user is unknown."""
+    with SessionLocal.begin() as session:
+        db_user = _get_db_user(session, telegram_id)
+        if not db_user:
+            return None
+        db_user.language = language
+        return db_user.id
+
+
 async def handle_language_selection(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle language selection."""
     user = update.effective_user
     text = update.message.text
-    current_lang = get_user_language(user.id)
+    current_lang = await get_user_language(user.id)
     
     if text == get_text('btn_back_main', current_lang):
         await update.message.reply_text(
             get_text('back_to_main', current_lang),
-            reply_markup=get_main_menu_keyboard(user.id)
+            reply_markup=get_main_menu_keyboard(user.id, current_lang)
         )
         return CHOOSING_ACTION
     
@@ -190,92 +351,99 @@ async def handle_language_selection(update: Update, context: ContextTypes.DEFAUL
     
     if new_language:
         # Update language inside a transaction, then send the keyboard AFTER commit
-        updated_language = False
-        with SessionLocal.begin() as session:
-            db_user = session.query(User).filter(User.telegram_id == user.id).first()
-            if db_user:
-                db_user.language = new_language.value
-                updated_language = True
-                tracker = get_user_tracker()
-                if tracker:
-                    tracker.update_user_activity(db_user.id)
-
-        if updated_language:
+        user_id = await asyncio.to_thread(_set_user_language, user.id, new_language)
+
+        if user_id is not None:
+            tracker = get_user_tracker()
+            if tracker:
+                tracker.update_user_activity(user_id)
+            cache_user(user.id, user_id, new_language)
             # Now that the transaction has been committed, the keyboard will be built with the new language
             await update.message.reply_text(
                 get_text('language_changed', new_language),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, new_language)
             )
             return CHOOSING_ACTION
     
     await update.message.reply_text(
         get_text('unknown_command', current_lang),
-        reply_markup=get_language_selection_keyboard(user.id)
+        reply_markup=get_language_selection_keyboard(user.id, current_lang)
     )
     return SELECTING_LANGUAGE
 
 
+def _load_distribution_users(blocked: frozenset) -> List[User]:
+    """Load users that should receive summaries, with their topics eagerly loaded."""
+    with SessionLocal() as session:
+        users_query = (
+            session.query(User)
+            .options(selectinload(User.user_topics))
+            .filter(User.telegram_id.isnot(None))
+        )
+        if blocked:
+            # Users who blocked the bot never leave the database
+            users_query = users_query.filter(User.telegram_id.notin_(blocked))
+        return users_query.all()
+
+
 async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle main menu selections."""
     user = update.effective_user
     text = update.message.text
+    username_or_id = user.username or str(user.id)
     
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        if db_user:
-            tracker = get_user_tracker()
-            if tracker:
-                tracker.update_user_activity(db_user.id)
+    cached_user = await get_cached_user(user.id)
+    if cached_user:
+        tracker = get_user_tracker()
+        if tracker:
+            tracker.update_user_activity(cached_user[0])
     
-    lang = get_user_language(user.id)
+    lang = cached_user[1] if cached_user else Language.ENGLISH
+    action = _menu_actions(lang).get(text)
     
-    if text == get_text('btn_help', lang):
+    if action == "help":
         await help_command(update, context)
         return CHOOSING_ACTION
     
-    elif text == get_text('btn_manage_topics', lang):
+    elif action == "manage_topics":
         await update.message.reply_text(
-            f"{get_text('topics_management_title', lang)}\n\n"
-            f"{get_text('topics_management_desc', lang)}\n\n"
-            f"{get_text('prompt_what_to_do', lang)}",
-            reply_markup=get_topics_menu_keyboard(user.id),
+            _topics_menu_text(lang),
+            reply_markup=get_topics_menu_keyboard(user.id, lang),
             parse_mode='Markdown'
         )
         return CHOOSING_ACTION
         
-    elif text == get_text('btn_manage_sources', lang):
+    elif action == "manage_sources":
         await update.message.reply_text(
-            f"{get_text('sources_management_title', lang)}\n\n"
-            f"{get_text('sources_management_desc', lang)}\n\n"
-            f"{get_text('prompt_what_to_do', lang)}",
-            reply_markup=get_sources_menu_keyboard(user.id),
+            _sources_menu_text(lang),
+            reply_markup=get_sources_menu_keyboard(user.id, lang),
             parse_mode='Markdown'
         )
         return CHOOSING_ACTION
         
-    elif text == get_text('btn_view_settings', lang):
+    elif action == "view_settings":
         return await view_settings(update, context)
         
-    elif text == get_text('btn_change_language', lang):
+    elif action == "change_language":
         return await show_language_selection(update, context)
         
-    elif text == get_text('btn_testing', lang):
+    elif action == "testing":
         if not is_admin_user(user.id):
             await update.message.reply_text(
                 get_text('access_denied', lang),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, lang)
             )
             return CHOOSING_ACTION
             
         await update.message.reply_text(
             f"{get_text('testing_menu_title', lang)}\n\n"
             f"{get_text('testing_menu_desc', lang)}",
-            reply_markup=get_testing_menu_keyboard(user.id)
+            reply_markup=get_testing_menu_keyboard(user.id, lang)
         )
         return CHOOSING_ACTION
         
     # Handle topics submenu
-    elif text == get_text('btn_add_topics', lang):
+    elif action == "add_topics":
         back_keyboard = [[get_text('btn_back_topics', lang)]]
         back_markup = ReplyKeyboardMarkup(back_keyboard, one_time_keyboard=True)
         
@@ -287,14 +455,14 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return ADDING_TOPICS
         
-    elif text == get_text('btn_remove_topics', lang):
+    elif action == "remove_topics":
         return await remove_topics(update, context)
         
-    elif text == get_text('btn_view_topics', lang):
+    elif action == "view_topics":
         return await view_topics(update, context)
     
     # Handle sources submenu
-    elif text == get_text('btn_add_sources', lang):
+    elif action == "add_sources":
         back_keyboard = [[get_text('btn_back_sources', lang)]]
         back_markup = ReplyKeyboardMarkup(back_keyboard, one_time_keyboard=True)
         
@@ -306,25 +474,25 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
         )
         return ADDING_SOURCES
         
-    elif text == get_text('btn_remove_sources', lang):
+    elif action == "remove_sources":
         return await remove_sources(update, context)
         
-    elif text == get_text('btn_view_sources', lang):
+    elif action == "view_sources":
         return await view_sources(update, context)
         
-    elif text == get_text('btn_back_main', lang):
+    elif action == "back_main":
         await update.message.reply_text(
             get_text('back_to_main', lang),
-            reply_markup=get_main_menu_keyboard(user.id)
+            reply_markup=get_main_menu_keyboard(user.id, lang)
         )
         return CHOOSING_ACTION
     
     # Handle testing menu  
-    elif text == get_text('btn_run_collection', lang):
+    elif action == "run_collection":
         if not is_admin_user(user.id):
             await update.message.reply_text(
                 get_text('testing_access_denied', lang),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, lang)
             )
             return CHOOSING_ACTION
             
@@ -338,7 +506,7 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
         try:
             if notifier:
-                await notifier.notify_system_performance("collection_started", {"is_initial": False, "manual": True})
+                notifier.queue_system_performance("collection_started", {"is_initial": False, "manual": True})
             
             collected_total, collected_stats = await run_collection()
             collection_duration = time.time() - start_time
@@ -348,43 +516,32 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
             filtering_duration = time.time() - filter_start_time
             
             if notifier:
-                await notifier.notify_system_performance("collection_completed", {
-                    "duration": round(collection_duration, 2),
-                    "messages_collected": collected_total,
-                    "messages_processed": collected_stats.get("messages_processed", "N/A"),
-                    "skipped_empty": collected_stats.get("skipped_empty", "N/A"),
-                    "skipped_old": collected_stats.get("skipped_old", "N/A"),
-                    "manual": True
-                })
-                await notifier.notify_system_performance("filtering_completed", {
-                    "duration": round(filtering_duration, 2),
-                    "filtered_messages": filter_result.get("messages_filtered", "N/A"),
-                    "users_processed": filter_result.get("users_processed", "N/A"),
-                    "topics_matched": filter_result.get("topics_matched", "N/A"),
-                    "manual": True
-                })
+                notifier.queue_collection_results(
+                    collection_duration, collected_total, collected_stats,
+                    filtering_duration, filter_result, manual=True,
+                )
             
             await update.message.reply_text(
                 get_text('collection_success', lang),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, lang)
             )
         except Exception as e:
             logger.error(f"Manual collection and filtering failed: {e}")
             if notifier:
-                await notifier.notify_error("Manual Collection/Filtering", str(e), {"user": user.username or str(user.id)})
+                await notifier.notify_error("Manual Collection/Filtering", str(e), {"user": username_or_id})
             
             await update.message.reply_text(
                 get_text('collection_failed', lang, error=str(e)),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, lang)
             )
         
         return CHOOSING_ACTION
         
-    elif text == get_text('btn_generate_summaries', lang):
+    elif action == "generate_summaries":
         if not is_admin_user(user.id):
             await update.message.reply_text(
                 get_text('testing_access_denied', lang),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, lang)
             )
             return CHOOSING_ACTION
             
@@ -404,131 +561,133 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await generate_summaries_async(days_back=1)
             generation_duration = time.time() - start_time
             
-            with SessionLocal() as session:
-                from typing import List
-                users: List[User] = session.query(User).filter(User.telegram_id.isnot(None)).all()
-                users_count = len(users)
-                tracker = get_user_tracker()
-
-                for db_user in users:
-                    if tracker and db_user.telegram_id in tracker.blocked_users:
-                        logger.info(f"Skipping user {db_user.id} (blocked bot)")
-                        continue
-                    
-                    summaries = get_user_summaries(db_user.id, days_back=1)
-                    if not summaries:
-                        try:
-                            user_lang = Language(db_user.language) if getattr(db_user, "language", None) else Language.ENGLISH
-                        except Exception:
-                            user_lang = Language.ENGLISH
-                        user_stats = get_user_stats(db_user.id, days_back=1)
-                        time_analysis = calculate_time_saved(user_stats) if user_stats else None
-                        stats_lines: list[str] = []
-                        if user_stats and time_analysis:
-                            stats_lines.append(f"\n\n{get_text('stats_title', user_lang)}")
-                            if hasattr(user_stats, "messages_collected"):
-                                stats_lines.append(f"• {get_text('stats_messages_collected', user_lang)} {user_stats.messages_collected}")
-                            has_topics = bool(getattr(db_user, "user_topics", []))
-                            if has_topics and hasattr(user_stats, "messages_filtered"):
-                                matched = getattr(user_stats, "topics_matched", 0)
-                                stats_lines.append(
-                                    f"• {get_text('stats_messages_filtered', user_lang)} {user_stats.messages_filtered} ("
-                                    + get_text('stats_matched_topics_suffix', user_lang, count=matched)
-                                    + ")"
-                                )
-                            if not has_topics and hasattr(user_stats, "sources_processed"):
-                                stats_lines.append(f"• {get_text('stats_sources_processed', user_lang)} {user_stats.sources_processed}")
-                            if time_analysis.get("time_saved", 0) > 0:
-                                stats_lines.append(
-                                    f"• {get_text('stats_time_saved', user_lang)} ~{format_time_duration(time_analysis['time_saved'], user_lang)} ("
-                                    + get_text('stats_vs_manual', user_lang)
-                                    + ")"
-                                )
-                                stats_lines.append(
-                                    f"• {get_text('stats_efficiency', user_lang)} {time_analysis['efficiency_ratio']:.1f}"
-                                    + get_text('stats_efficiency_suffix', user_lang)
-                                )
-                        message_no_updates = get_text('nothing_interesting', user_lang) + ("\n".join(stats_lines) if stats_lines else "")
-                        try:
-                            await context.bot.send_message(
-                                chat_id=db_user.telegram_id,
-                                text=message_no_updates,
-                            )
-                            logger.info(f"Sent 'no updates' message to user {db_user.id} (chat {db_user.telegram_id})")
-                            sent_count += 1
-                        except Exception as e:
-                            if tracker:
-                                await tracker.handle_message_send_error(e, db_user.telegram_id, db_user.username)
-                            logger.error(
-                                f"Failed to send 'no updates' message to user {db_user.id} (chat {db_user.telegram_id}): {e}"
-                            )
-                            failed_count += 1
-                        continue
-
-                    summary = summaries[0]
-                    summaries_count += 1
-                    message_text = summary.content
-
-                    # Split text safely to avoid breaking formatting entities
-                    chunks = split_text_safely(message_text, max_chunk_size=4096)
-                    user_failed = False
-                    for chunk in chunks:
-                        try:
-                            await context.bot.send_message(
-                                chat_id=db_user.telegram_id,
-                                text=chunk,
-                                parse_mode="HTML",
-                            )
-                        except Exception as e:
-                            if tracker:
-                                await tracker.handle_message_send_error(e, db_user.telegram_id, db_user.username)
-                            logger.error(
-                                f"Failed to send summary chunk to user {db_user.id} (chat {db_user.telegram_id}): {e}"
-                            )
-                            user_failed = True
-                            break
-                    
-                    if user_failed:
-                        failed_count += 1
+            tracker = get_user_tracker()
+            blocked = frozenset(tracker.blocked_users) if tracker else frozenset()
+            if blocked:
+                logger.info(f"Skipping {len(blocked)} users (blocked bot)")
+            users = await asyncio.to_thread(_load_distribution_users, blocked)
+            users_count = len(users)
+            user_ids = [db_user.id for db_user in users]
+            summaries_by_user, stats_by_user = await asyncio.gather(
+                asyncio.to_thread(get_user_summaries_bulk, user_ids, 1),
+                asyncio.to_thread(get_user_stats_bulk, user_ids, 1),
+            )
+
+            # Split text safely to avoid breaking formatting entities; done in worker threads up front
+            # so splitting does not block the event loop between sends
+            split_summaries = await asyncio.gather(*(
+                asyncio.to_thread(split_text_cached, summary.content, 4096)
+                for summary in summaries_by_user.values()
+            ))
+            chunks_by_user = dict(zip(summaries_by_user.keys(), split_summaries))
+
+            async def deliver(db_user: User) -> Tuple[bool, bool]:
+                """Send the summary (or 'no updates' note) to one user.
+
+                Returns (had_summary, delivered).
+                """
+                summary = summaries_by_user.get(db_user.id)
+                if not summary:
+                    user_lang = db_user.language
+                    user_stats = stats_by_user.get(db_user.id)
+                    time_analysis = calculate_time_saved(user_stats) if user_stats else None
+                    if user_stats and time_analysis:
+                        time_saved = time_analysis.get("time_saved", 0)
+                        template = _no_updates_template(
+                            user_lang,
+                            with_stats=True,
+                            has_topics=bool(db_user.user_topics),
+                            with_time_saved=time_saved > 0,
+                        )
+                        message_no_updates = template.format(
+                            messages_collected=user_stats.messages_collected,
+                            messages_filtered=user_stats.messages_filtered,
+                            topics_matched=user_stats.topics_matched,
+                            sources_processed=user_stats.sources_processed,
+                            time_saved=format_time_duration(time_saved, user_lang),
+                            efficiency_ratio=time_analysis["efficiency_ratio"],
+                        )
                     else:
-                        sent_count += 1
-                
-                # Notify admin about summary generation and sending
-                if notifier:
-                    await notifier.notify_system_performance("summaries_generated", {
-                        "summaries_count": summaries_count,
-                        "users_count": users_count,
-                        "duration": round(generation_duration, 2),
-                        "manual": True,
-                        "user": user.username or str(user.id)
-                    })
-                    await notifier.notify_system_performance("summaries_sent", {
-                        "sent_count": sent_count,
-                        "failed_count": failed_count,
-                        "manual": True
-                    })
+                        message_no_updates = _no_updates_template(user_lang)
+                    try:
+                        await send_message_limited(
+                            context.bot,
+                            chat_id=db_user.telegram_id,
+                            text=message_no_updates,
+                        )
+                        logger.info(f"Sent 'no updates' message to user {db_user.id} (chat {db_user.telegram_id})")
+                        return False, True
+                    except Exception as e:
+                        if tracker:
+                            await tracker.handle_message_send_error(e, db_user.telegram_id, db_user.username)
+                        logger.error(
+                            f"Failed to send 'no updates' message to user {db_user.id} (chat {db_user.telegram_id}): {e}"
+                        )
+                        return False, False
+
+                for chunk in chunks_by_user[db_user.id]:
+                    try:
+                        await send_message_limited(
+                            context.bot,
+                            chat_id=db_user.telegram_id,
+                            text=chunk,
+                            parse_mode="HTML",
+                        )
+                    except Exception as e:
+                        if tracker:
+                            await tracker.handle_message_send_error(e, db_user.telegram_id, db_user.username)
+                        logger.error(
+                            f"Failed to send summary chunk to user {db_user.id} (chat {db_user.telegram_id}): {e}"
+                        )
+                        return True, False
+                return True, True
+
+            # Users are sent to concurrently; send_message_limited enforces Telegram's global rate limit
+            results = await asyncio.gather(*(deliver(db_user) for db_user in users))
+            for had_summary, delivered in results:
+                if had_summary:
+                    summaries_count += 1
+                if delivered:
+                    sent_count += 1
+                else:
+                    failed_count += 1
+            
+            # Notify admin about summary generation and sending
+            if notifier:
+                notifier.queue_system_performance("summaries_generated", {
+                    "summaries_count": summaries_count,
+                    "users_count": users_count,
+                    "duration": round(generation_duration, 2),
+                    "manual": True,
+                    "user": username_or_id
+                })
+                notifier.queue_system_performance("summaries_sent", {
+                    "sent_count": sent_count,
+                    "failed_count": failed_count,
+                    "manual": True
+                })
+            
+            # Send confirmation to admin
+            await update.message.reply_text(
+                f"✅ **Manual Summary Distribution Complete**\n\n"
+                f"📊 **Statistics:**\n"
+                f"• Generated summaries: {summaries_count}\n"
+                f"• Total users: {users_count}\n"
+                f"• Successfully sent: {sent_count}\n"
+                f"• Failed to send: {failed_count}\n"
+                f"• Generation time: {round(generation_duration, 2)}s",
+                reply_markup=get_main_menu_keyboard(user.id, lang),
+                parse_mode='Markdown'
+            )
                 
-                # Send confirmation to admin
-                await update.message.reply_text(
-                    f"✅ **Manual Summary Distribution Complete**\n\n"
-                    f"📊 **Statistics:**\n"
-                    f"• Generated summaries: {summaries_count}\n"
-                    f"• Total users: {users_count}\n"
-                    f"• Successfully sent: {sent_count}\n"
-                    f"• Failed to send: {failed_count}\n"
-                    f"• Generation time: {round(generation_duration, 2)}s",
-                    reply_markup=get_main_menu_keyboard(user.id),
-                    parse_mode='Markdown'
-                )
-                    
         except Exception as e:
             logger.error(f"Manual summary generation and distribution failed: {e}")
             if notifier:
-                await notifier.notify_error("Manual Summary Generation", str(e), {"user": user.username or str(user.id)})
+                await notifier.notify_error("Manual Summary Generation", str(e), {"user": username_or_id})
             
             await update.message.reply_text(
                 get_text('summaries_failed', lang, error=str(e)),
-                reply_markup=get_main_menu_keyboard(user.id)
+                reply_markup=get_main_menu_keyboard(user.id, lang)
             )
         
         return CHOOSING_ACTION
@@ -536,24 +695,55 @@ async def main_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     else:
         await update.message.reply_text(
             get_text('unknown_command', lang),
-            reply_markup=get_main_menu_keyboard(user.id)
+            reply_markup=get_main_menu_keyboard(user.id, lang)
         )
         return CHOOSING_ACTION
 
 
+def _add_user_topics(telegram_id: int, topics: List[str]) -> Optional[Dict[str, Any]]:
+    """Insert new normalized topics for a user, respecting the per-user limit.
+
+    Returns None if the user is unknown, otherwise a dict with the outcome.
+    """
+    with SessionLocal.begin() as session:
+        db_user = _get_user_with_prefs(session, telegram_id)
+        if not db_user:
+            return None
+
+        existing_topics = {ut.topic for ut in db_user.user_topics}
+        remaining_slots = max(0, MAX_TOPICS_PER_USER - len(existing_topics))
+        if remaining_slots <= 0:
+            return {"user_id": db_user.id, "limit_reached": True}
+
+        new_topics = [topic for topic in topics if topic not in existing_topics]
+        topics_added = new_topics[:remaining_slots]
+        if topics_added:
+            session.execute(
+                insert(UserTopic),
+                [{"user_id": db_user.id, "topic": topic} for topic in topics_added],
+            )
+
+        return {
+            "user_id": db_user.id,
+            "limit_reached": False,
+            "added": topics_added,
+            "skipped_duplicates": len(topics) - len(new_topics),
+            "remaining_slots": remaining_slots - len(topics_added),
+            "total_count": len(existing_topics) + len(topics_added),
+        }
+
+
 async def add_topics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Add topics to user's preferences."""
     user = update.effective_user
     topics_text = update.message.text.strip()
     
     # Handle back button
-    lang = get_user_language(user.id)
-    if topics_text == get_text('btn_back_topics', lang):
+    lang = await get_user_language(user.id)
+    if _back_buttons(lang).get(topics_text) == "topics":
         await update.message.reply_text(
-            f"{get_text('topics_management_title', lang)}\n\n"
-            f"{get_text('topics_management_desc', lang)}\n\n"
-            f"{get_text('prompt_what_to_do', lang)}",
-            reply_markup=get_topics_menu_keyboard(user.id),
+            _topics_menu_text(lang),
+            reply_markup=get_topics_menu_keyboard(user.id, lang),
             parse_mode='Markdown'
         )
         return CHOOSING_ACTION
@@ -561,19 +751,19 @@ async def add_topics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if not topics_text:
         await update.message.reply_text(
             get_text('provide_topics', lang),
-            reply_markup=get_topics_menu_keyboard(user.id)
+            reply_markup=get_topics_menu_keyboard(user.id, lang)
         )
         return CHOOSING_ACTION
     
-    # Parse topics from comma-separated string
-    raw_topics = [topic.strip() for topic in topics_text.split(',') if topic.strip()]
-    # Normalize to lowercase, keep original mapping for potential future use
-    normalized_topics = [t.lower() for t in raw_topics]
-    # Validate topic sizes
+    # Parse, normalize to lowercase, dedupe and validate comma-separated topics in one pass
     valid_normalized_topics: list[str] = []
     invalid_topics: list[str] = []
     seen_normalized: set[str] = set()
-    for raw, norm in zip(raw_topics, normalized_topics):
+    for raw in topics_text.split(','):
+        raw = raw.strip()
+        if not raw:
+            continue
+        norm = raw.lower()
         if norm in seen_normalized:
             continue
         seen_normalized.add(norm)
@@ -585,100 +775,142 @@ async def add_topics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     if not valid_normalized_topics:
         await update.message.reply_text(
             get_text('no_valid_topics', lang),
-            reply_markup=get_topics_menu_keyboard(user.id)
+            reply_markup=get_topics_menu_keyboard(user.id, lang)
         )
         return CHOOSING_ACTION
     
-    # Update database
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        if db_user:
-            existing_topics = {ut.topic for ut in db_user.user_topics}
-            current_count = len(existing_topics)
-            remaining_slots = max(0, MAX_TOPICS_PER_USER - current_count)
-
-            if remaining_slots <= 0:
-                await update.message.reply_text(
-                    get_text('topics_limit_reached', lang, limit=MAX_TOPICS_PER_USER),
-                    reply_markup=get_topics_menu_keyboard(user.id)
-                )
-                return CHOOSING_ACTION
-
-            topics_added: list[str] = []
-            skipped_duplicates: list[str] = []
-            for topic in valid_normalized_topics:
-                if topic in existing_topics or topic in topics_added:
-                    skipped_duplicates.append(topic)
-                    continue
-                if remaining_slots <= 0:
-                    break
-                session.add(UserTopic(user_id=db_user.id, topic=topic))
-                topics_added.append(topic)
-                remaining_slots -= 1
-
-            if topics_added:
-                session.commit()
-
-                # Notify admin about topics added
-                notifier = get_notifier()
-                if notifier:
-                    await notifier.notify_user_activity(
-                        username=user.username or str(user.id),
-                        activity_type="topics_added",
-                        details={
-                            "topics": topics_added,
-                            "total_count": len(existing_topics) + len(topics_added)
-                        }
-                    )
-
-                tracker = get_user_tracker()
-                if tracker:
-                    tracker.update_user_activity(db_user.id)
-
-                added_preview = ', '.join(topics_added)
-                base_text = get_text('topics_added_success', lang, topics=added_preview)
-                suffix_lines: list[str] = []
-                if invalid_topics:
-                    examples = ', '.join(invalid_topics[:3])
-                    suffix_lines.append(get_text('topics_suffix_invalid', lang, count=len(invalid_topics), examples=examples))
-                if skipped_duplicates:
-                    suffix_lines.append(get_text('topics_suffix_duplicates', lang, count=len(skipped_duplicates)))
-                if remaining_slots == 0 and (len(valid_normalized_topics) > len(topics_added)):
-                    suffix_lines.append(get_text('topics_suffix_limit_reached', lang))
-                suffix_text = ("\n\n" + "\n".join(suffix_lines)) if suffix_lines else ""
-
-                await update.message.reply_text(
-                    base_text + suffix_text,
-                    reply_markup=get_topics_menu_keyboard(user.id),
-                    parse_mode='Markdown'
-                )
-            else:
-                await update.message.reply_text(
-                    get_text('topics_nothing_added', lang),
-                    reply_markup=get_topics_menu_keyboard(user.id)
-                )
-        else:
-            await update.message.reply_text(
-                get_text('user_not_found', lang),
-                reply_markup=get_topics_menu_keyboard(user.id)
+    # Update database in a worker thread; Telegram calls happen after commit
+    result = await asyncio.to_thread(_add_user_topics, user.id, valid_normalized_topics)
+    if result is None:
+        await update.message.reply_text(
+            get_text('user_not_found', lang),
+            reply_markup=get_topics_menu_keyboard(user.id, lang)
+        )
+        return CHOOSING_ACTION
+    
+    if result["limit_reached"]:
+        await update.message.reply_text(
+            get_text('topics_limit_reached', lang, limit=MAX_TOPICS_PER_USER),
+            reply_markup=get_topics_menu_keyboard(user.id, lang)
+        )
+        return CHOOSING_ACTION
+    
+    topics_added = result["added"]
+    skipped_duplicates = result["skipped_duplicates"]
+    remaining_slots = result["remaining_slots"]
+    
+    if topics_added:
+        # Notify admin about topics added
+        notifier = get_notifier()
+        if notifier:
+            notifier.queue_user_activity(
+                username=user.username or str(user.id),
+                activity_type="topics_added",
+                details={
+                    "topics": topics_added,
+                    "total_count": result["total_count"]
+                }
             )
+
+        tracker = get_user_tracker()
+        if tracker:
+            tracker.update_user_activity(result["user_id"])
+
+        added_preview = ', '.join(topics_added)
+        base_text = get_text('topics_added_success', lang, topics=added_preview)
+        suffix_lines: list[str] = []
+        if invalid_topics:
+            examples = ', '.join(invalid_topics[:3])
+            suffix_lines.append(get_text('topics_suffix_invalid', lang, count=len(invalid_topics), examples=examples))
+        if skipped_duplicates:
+            suffix_lines.append(get_text('topics_suffix_duplicates', lang, count=skipped_duplicates))
+        if remaining_slots == 0 and (len(valid_normalized_topics) > len(topics_added)):
+            suffix_lines.append(get_text('topics_suffix_limit_reached', lang))
+        suffix_text = ("\n\n" + "\n".join(suffix_lines)) if suffix_lines else ""
+
+        await update.message.reply_text(
+            base_text + suffix_text,
+            reply_markup=get_topics_menu_keyboard(user.id, lang),
+            parse_mode='Markdown'
+        )
+    else:
+        await update.message.reply_text(
+            get_text('topics_nothing_added', lang),
+            reply_markup=get_topics_menu_keyboard(user.id, lang)
+        )
     
     return CHOOSING_ACTION
 
 
+def _attach_user_sources(telegram_id: int, valid_sources: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Attach validated sources to a user, creating Source rows as needed.
+
+    Returns None if the user is unknown, otherwise a dict with the outcome.
+    """
+    with SessionLocal.begin() as session:
+        db_user = _get_user_with_prefs(session, telegram_id)
+        if not db_user:
+            return None
+
+        current_count = len(db_user.sources) if db_user.sources else 0
+        remaining_slots = max(0, MAX_SOURCES_PER_USER - current_count)
+        if remaining_slots <= 0:
+            return {"user_id": db_user.id, "limit_reached": True}
+
+        # Store canonical usernames without leading '@' to avoid duplicates
+        wanted = {source_info["normalized"].lstrip('@'): source_info for source_info in valid_sources}
+
+        # Resolve all Source rows with one IN query; missing ones are inserted with the association
+        # rows when the transaction commits
+        existing = {
+            source.username: source
+            for source in session.query(Source).filter(Source.username.in_(wanted.keys())).all()
+        }
+        missing = [
+            Source(title=wanted[username]["title"], username=username)
+            for username in wanted.keys() - existing.keys()
+        ]
+        if missing:
+            session.add_all(missing)
+            existing.update((source.username, source) for source in missing)
+
+        attached = {source.username for source in db_user.sources}
+        sources_added = []
+        sources_already_exist = []
+        sources_skipped_over_limit = []
+        for canonical_username, source_info in wanted.items():
+            if canonical_username not in attached:
+                if remaining_slots > 0:
+                    db_user.sources.append(existing[canonical_username])
+                    attached.add(canonical_username)
+                    sources_added.append(source_info)
+                    remaining_slots -= 1
+                else:
+                    sources_skipped_over_limit.append(source_info)
+            else:
+                sources_already_exist.append(source_info)
+
+        return {
+            "user_id": db_user.id,
+            "limit_reached": False,
+            "added": sources_added,
+            "already_exist": sources_already_exist,
+            "skipped_over_limit": sources_skipped_over_limit,
+            "total_count": len(db_user.sources),
+        }
+
+
 async def add_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Add sources to user's preferences."""
     user = update.effective_user
     sources_text = update.message.text.strip()
     
     # Handle back button
-    lang = get_user_language(user.id)
-    if sources_text == get_text('btn_back_sources', lang):
+    lang = await get_user_language(user.id)
+    if _back_buttons(lang).get(sources_text) == "sources":
         await update.message.reply_text(
-            f"{get_text('sources_management_title', lang)}\n\n"
-            f"{get_text('sources_management_desc', lang)}\n\n"
-            f"{get_text('prompt_what_to_do', lang)}",
-            reply_markup=get_sources_menu_keyboard(user.id),
+            _sources_menu_text(lang),
+            reply_markup=get_sources_menu_keyboard(user.id, lang),
             parse_mode='Markdown'
         )
         return CHOOSING_ACTION
@@ -686,7 +918,7 @@ async def add_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     if not sources_text:
         await update.message.reply_text(
             get_text('provide_sources', lang),
-            reply_markup=get_sources_menu_keyboard(user.id)
+            reply_markup=get_sources_menu_keyboard(user.id, lang)
         )
         return CHOOSING_ACTION
     
@@ -697,115 +929,95 @@ async def add_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
     )
     
     try:
-        # Get Telegram client for validation
-        async with TelegramCollector() as collector:
-            validation_result = await validate_sources_batch(collector.client, sources_text)
-            
-            await validation_message.delete()
-            
-            if not validation_result["valid"]:
-                error_message = format_validation_result(validation_result)
-                await update.message.reply_text(
-                    error_message,
-                    reply_markup=get_sources_menu_keyboard(user.id),
-                    parse_mode='Markdown'
+        # Reuse the long-lived Telegram client for validation
+        collector = await get_shared_collector()
+        validation_result = await validate_sources_batch(collector.client, sources_text)
+        
+        await validation_message.delete()
+        
+        if not validation_result["valid"]:
+            error_message = format_validation_result(validation_result)
+            # A top-level error is rendered as plain text; only the per-source breakdown uses Markdown
+            await update.message.reply_text(
+                error_message,
+                reply_markup=get_sources_menu_keyboard(user.id, lang),
+                parse_mode=None if "error" in validation_result else 'Markdown'
+            )
+            return CHOOSING_ACTION
+        
+        valid_sources = validation_result["valid_sources"]
+        
+        result = await asyncio.to_thread(_attach_user_sources, user.id, valid_sources)
+        if result is None:
+            await update.message.reply_text(
+                get_text('user_not_found', lang),
+                reply_markup=get_sources_menu_keyboard(user.id, lang)
+            )
+        elif result["limit_reached"]:
+            await update.message.reply_text(
+                get_text('sources_limit_reached', lang, limit=MAX_SOURCES_PER_USER),
+                reply_markup=get_sources_menu_keyboard(user.id, lang)
+            )
+            return CHOOSING_ACTION
+        elif result["added"]:
+            sources_added = result["added"]
+            sources_already_exist = result["already_exist"]
+            sources_skipped_over_limit = result["skipped_over_limit"]
+            notifier = get_notifier()
+            if notifier:
+                notifier.queue_user_activity(
+                    username=user.username or str(user.id),
+                    activity_type="sources_added",
+                    details={
+                        "sources": [s["normalized"] for s in sources_added],
+                        "total_count": result["total_count"]
+                    }
                 )
-                return CHOOSING_ACTION
-            
-            valid_sources = validation_result["valid_sources"]
+
+            tracker = get_user_tracker()
+            if tracker:
+                tracker.update_user_activity(result["user_id"])
             
-            with SessionLocal.begin() as session:
-                db_user = session.query(User).filter(User.telegram_id == user.id).first()
-                if db_user:
-                    current_count = len(db_user.sources) if db_user.sources else 0
-                    remaining_slots = max(0, MAX_SOURCES_PER_USER - current_count)
-                    if remaining_slots <= 0:
-                        await update.message.reply_text(
-                            get_text('sources_limit_reached', lang, limit=MAX_SOURCES_PER_USER),
-                            reply_markup=get_sources_menu_keyboard(user.id)
-                        )
-                        return CHOOSING_ACTION
-
-                    sources_added = []
-                    sources_already_exist = []
-                    sources_skipped_over_limit = []
-                    for source_info in valid_sources:
-                        normalized_source = source_info["normalized"]
-                        # Store canonical username without leading '@' to avoid duplicates
-                        canonical_username = normalized_source.lstrip('@')
-                        source_obj = session.query(Source).filter(Source.username == canonical_username).first()
-                        if not source_obj:
-                            source_obj = Source(title=source_info["title"], username=canonical_username)
-                            session.add(source_obj)
-                            session.flush()
-                        if source_obj not in db_user.sources:
-                            if remaining_slots > 0:
-                                db_user.sources.append(source_obj)
-                                sources_added.append(source_info)
-                                remaining_slots -= 1
-                            else:
-                                sources_skipped_over_limit.append(source_info)
-                        else:
-                            sources_already_exist.append(source_info)
-                    if sources_added:
-                        notifier = get_notifier()
-                        if notifier:
-                            await notifier.notify_user_activity(
-                                username=user.username or str(user.id),
-                                activity_type="sources_added",
-                                details={
-                                    "sources": [s["normalized"] for s in sources_added],
-                                    "total_count": len(db_user.sources)
-                                }
-                            )
-
-                        tracker = get_user_tracker()
-                        if tracker:
-                            tracker.update_user_activity(db_user.id)
-                        
-                        success_message = get_text('sources_added_success', lang, count=len(sources_added)) + "\n\n"
-                        for source_info in sources_added:
-                            verified_badge = "✓" if source_info["verified"] else ""
-                            success_message += f"📡 **{source_info['title']}** {verified_badge}\n"
-                            success_message += f"   └ `{source_info['normalized']}`\n\n"
-                        if sources_already_exist:
-                            success_message += get_text('sources_already_exist', lang, count=len(sources_already_exist)) + "\n"
-                            for source_info in sources_already_exist:
-                                success_message += f"• {source_info['title']}\n"
-                        if sources_skipped_over_limit:
-                            success_message += get_text('sources_limit_reached_suffix', lang, count=len(sources_skipped_over_limit)) + "\n"
-                        success_message += "\n" + get_text('sources_monitor_note', lang)
-                        await update.message.reply_text(
-                            success_message,
-                            reply_markup=get_sources_menu_keyboard(user.id),
-                            parse_mode='Markdown'
-                        )
-                    else:
-                        existing_message = get_text('sources_already_exist', lang, count=len(sources_already_exist)) + "\n\n"
-                        for source_info in sources_already_exist:
-                            existing_message += f"📡 **{source_info['title']}**\n"
-                            existing_message += f"   └ `{source_info['normalized']}`\n\n"
-                        await update.message.reply_text(
-                            existing_message,
-                            reply_markup=get_sources_menu_keyboard(user.id),
-                            parse_mode='Markdown'
-                        )
-                else:
-                    await update.message.reply_text(
-                        get_text('user_not_found', lang),
-                        reply_markup=get_sources_menu_keyboard(user.id)
-                    )
+            parts = [get_text('sources_added_success', lang, count=len(sources_added)), "\n\n"]
+            parts.extend(
+                f"📡 **{source_info['title']}** {'✓' if source_info['verified'] else ''}\n"
+                f"   └ `{source_info['normalized']}`\n\n"
+                for source_info in sources_added
+            )
+            if sources_already_exist:
+                parts.append(get_text('sources_already_exist', lang, count=len(sources_already_exist)) + "\n")
+                parts.extend(f"• {source_info['title']}\n" for source_info in sources_already_exist)
+            if sources_skipped_over_limit:
+                parts.append(get_text('sources_limit_reached_suffix', lang, count=len(sources_skipped_over_limit)) + "\n")
+            parts.append("\n" + get_text('sources_monitor_note', lang))
+            await update.message.reply_text(
+                "".join(parts),
+                reply_markup=get_sources_menu_keyboard(user.id, lang),
+                parse_mode='Markdown'
+            )
+        else:
+            sources_already_exist = result["already_exist"]
+            parts = [get_text('sources_already_exist', lang, count=len(sources_already_exist)), "\n\n"]
+            parts.extend(
+                f"📡 **{source_info['title']}**\n"
+                f"   └ `{source_info['normalized']}`\n\n"
+                for source_info in sources_already_exist
+            )
+            await update.message.reply_text(
+                "".join(parts),
+                reply_markup=get_sources_menu_keyboard(user.id, lang),
+                parse_mode='Markdown'
+            )
+        
+        if validation_result["invalid_count"] > 0:
+            error_summary = (
+                f"\n\n{get_text('sources_invalid_summary', lang, count=validation_result['invalid_count'])}\n"
+                + "".join(f"• {error}\n" for error in validation_result["errors"])
+            )
             
-            if validation_result["invalid_count"] > 0:
-                error_summary = f"\n\n{get_text('sources_invalid_summary', lang, count=validation_result['invalid_count'])}\n"
-                for error in validation_result["errors"]:
-                    error_summary += f"• {error}\n"
-                
-                await update.message.reply_text(
-                    error_summary,
-                    parse_mode='Markdown'
-                )
-    
+            # Plain text: no formatting, and raw usernames in errors may contain Markdown characters
+            await update.message.reply_text(error_summary)
+
     except Exception as e:
         try:
             await validation_message.delete()
@@ -815,220 +1027,242 @@ async def add_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
         logger.error(f"Error during source validation: {e}")
         await update.message.reply_text(
             get_text('validation_error', lang, error=str(e)),
-            reply_markup=get_sources_menu_keyboard(user.id)
+            reply_markup=get_sources_menu_keyboard(user.id, lang)
         )
     
     return CHOOSING_ACTION
 
 
+def _load_user_preferences(
+    telegram_id: int,
+    include_topics: bool = True,
+    include_sources: bool = True,
+) -> Optional[Tuple[List[str], List[str]]]:
+    """Load a user's topics (alphabetically) and source usernames, or None if the user is unknown.
+
+    Only the needed columns are selected; excluded collections come back empty.
+    """
+    with SessionLocal() as session:
+        user_id = session.scalar(select(User.id).where(User.telegram_id == telegram_id))
+        if user_id is None:
+            return None
+        topics: List[str] = []
+        sources: List[str] = []
+        if include_topics:
+            topics = list(session.scalars(
+                select(UserTopic.topic).where(UserTopic.user_id == user_id).order_by(UserTopic.topic)
+            ))
+        if include_sources:
+            sources = list(session.scalars(
+                select(Source.username)
+                .join(user_sources, user_sources.c.source_id == Source.id)
+                .where(user_sources.c.user_id == user_id)
+            ))
+        return topics, sources
+
+
 async def view_topics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Display user's current topics."""
     user = update.effective_user
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
     
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        if db_user and db_user.user_topics:
-            topics = [ut.topic for ut in db_user.user_topics]
-            if topics:
-                topics_text = '\n• '.join(sorted(topics))
-                message = get_text('current_topics', lang, topics=topics_text)
-            else:
-                message = get_text('no_topics_added', lang)
-        else:
-            message = get_text('no_topics_added', lang)
+    preferences = await asyncio.to_thread(_load_user_preferences, user.id, include_sources=False)
+    topics = preferences[0] if preferences else []
+    if topics:
+        topics_text = '\n• '.join(topics)
+        message = get_text('current_topics', lang, topics=topics_text)
+    else:
+        message = get_text('no_topics_added', lang)
     
-    await update.message.reply_text(message, reply_markup=get_topics_menu_keyboard(user.id), parse_mode='Markdown')
+    await update.message.reply_text(message, reply_markup=get_topics_menu_keyboard(user.id, lang), parse_mode='Markdown')
     return CHOOSING_ACTION
 
 
 async def view_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Display user's current sources."""
     user = update.effective_user
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
     
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        if db_user and db_user.sources:
-            sources = [s.username for s in db_user.sources]
-            sources_text = '\n• '.join(sources)
-            message = get_text('current_sources', lang, sources=sources_text)
-        else:
-            message = get_text('no_sources_added', lang)
+    preferences = await asyncio.to_thread(_load_user_preferences, user.id, include_topics=False)
+    sources = preferences[1] if preferences else []
+    if sources:
+        sources_text = '\n• '.join(sources)
+        message = get_text('current_sources', lang, sources=sources_text)
+    else:
+        message = get_text('no_sources_added', lang)
     
-    await update.message.reply_text(message, reply_markup=get_sources_menu_keyboard(user.id))
+    await update.message.reply_text(message, reply_markup=get_sources_menu_keyboard(user.id, lang))
     return CHOOSING_ACTION
 
 
 async def remove_topics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Remove topics from user's preferences."""
     user = update.effective_user
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
     
-    with SessionLocal.begin() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        if not db_user or not db_user.user_topics:
-            await update.message.reply_text(
-                get_text('no_topics_to_remove', lang),
-                reply_markup=get_topics_menu_keyboard(user.id)
-            )
-            return CHOOSING_ACTION
-        
-        topics = [ut.topic for ut in db_user.user_topics]
-        if topics:
-            topics_keyboard = [[topic] for topic in topics]
-            topics_keyboard.append([get_text('btn_back_topics', lang)])
-            topics_markup = ReplyKeyboardMarkup(topics_keyboard, one_time_keyboard=True)
-            
-            await update.message.reply_text(
-                get_text('remove_topics_title', lang),
-                reply_markup=topics_markup,
-                parse_mode='Markdown'
-            )
-            context.user_data['removing_topics'] = True
-            return REMOVING_ITEMS
+    preferences = await asyncio.to_thread(_load_user_preferences, user.id, include_sources=False)
+    topics = preferences[0] if preferences else []
+    if not topics:
+        await update.message.reply_text(
+            get_text('no_topics_to_remove', lang),
+            reply_markup=get_topics_menu_keyboard(user.id, lang)
+        )
+        return CHOOSING_ACTION
+    
+    topics_keyboard = [[topic] for topic in topics]
+    topics_keyboard.append([get_text('btn_back_topics', lang)])
+    topics_markup = ReplyKeyboardMarkup(topics_keyboard, one_time_keyboard=True)
     
     await update.message.reply_text(
-        get_text('no_topics_to_remove', lang),
-        reply_markup=get_topics_menu_keyboard(user.id)
+        get_text('remove_topics_title', lang),
+        reply_markup=topics_markup,
+        parse_mode='Markdown'
     )
-    return CHOOSING_ACTION
+    context.user_data['removing_topics'] = True
+    return REMOVING_ITEMS
 
 
 async def remove_sources(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Remove sources from user's preferences."""
     user = update.effective_user
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
     
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        if not db_user or not db_user.sources:
-            await update.message.reply_text(
-                get_text('no_sources_to_remove', lang),
-                reply_markup=get_sources_menu_keyboard(user.id)
-            )
-            return CHOOSING_ACTION
-        
-        sources_keyboard = [[source.username] for source in db_user.sources]
-        sources_keyboard.append([get_text('btn_back_sources', lang)])
-        sources_markup = ReplyKeyboardMarkup(sources_keyboard, one_time_keyboard=True)
-        
+    preferences = await asyncio.to_thread(_load_user_preferences, user.id, include_topics=False)
+    sources = preferences[1] if preferences else []
+    if not sources:
         await update.message.reply_text(
-            get_text('remove_sources_title', lang),
-            reply_markup=sources_markup,
-            parse_mode='Markdown'
+            get_text('no_sources_to_remove', lang),
+            reply_markup=get_sources_menu_keyboard(user.id, lang)
         )
-        context.user_data['removing_sources'] = True
-        return REMOVING_ITEMS
+        return CHOOSING_ACTION
+    
+    sources_keyboard = [[username] for username in sources]
+    sources_keyboard.append([get_text('btn_back_sources', lang)])
+    sources_markup = ReplyKeyboardMarkup(sources_keyboard, one_time_keyboard=True)
     
     await update.message.reply_text(
-        get_text('no_sources_to_remove', lang),
-        reply_markup=get_sources_menu_keyboard(user.id)
+        get_text('remove_sources_title', lang),
+        reply_markup=sources_markup,
+        parse_mode='Markdown'
     )
+    context.user_data['removing_sources'] = True
     return REMOVING_ITEMS
 
 
+def _remove_user_topic(telegram_id: int, topic: str) -> Optional[Tuple[int, int]]:
+    """Delete one of a user's topics; returns (user id, remaining count) or None if not found."""
+    with SessionLocal.begin() as session:
+        db_user = _get_db_user(session, telegram_id)
+        if not db_user:
+            return None
+        # The loaded collection both finds the row and gives the remaining count, with no extra queries
+        ut: UserTopic | None = next((ut for ut in db_user.user_topics if ut.topic == topic), None)
+        if not ut:
+            return None
+        db_user.user_topics.remove(ut)  # delete-orphan cascade deletes the row on flush
+        return db_user.id, len(db_user.user_topics)
+
+
+def _remove_user_source(telegram_id: int, username: str) -> Optional[Tuple[int, int]]:
+    """Detach one of a user's sources; returns (user id, remaining count) or None if not found."""
+    with SessionLocal.begin() as session:
+        db_user = _get_user_with_prefs(session, telegram_id)
+        if not db_user or not db_user.sources:
+            return None
+        # Find the Source object by username
+        source_to_remove = next((s for s in db_user.sources if s.username == username), None)
+        if not source_to_remove:
+            return None
+        db_user.sources.remove(source_to_remove)
+        return db_user.id, len(db_user.sources)
+
+
 async def handle_removal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle topic/source removal."""
     user = update.effective_user
     text = update.message.text
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
+    back_to = _back_buttons(lang).get(text)
     
-    if text == get_text('btn_back_topics', lang):
+    if back_to == "topics":
         context.user_data.pop('removing_topics', None)
         await update.message.reply_text(
-            f"{get_text('topics_management_title', lang)}\n\n"
-            f"{get_text('topics_management_desc', lang)}\n\n"
-            "What would you like to do?",
-            reply_markup=get_topics_menu_keyboard(user.id),
+            _topics_menu_text(lang),
+            reply_markup=get_topics_menu_keyboard(user.id, lang),
             parse_mode='Markdown'
         )
         return CHOOSING_ACTION
     
-    if text == get_text('btn_back_sources', lang):
+    if back_to == "sources":
         context.user_data.pop('removing_sources', None)
         await update.message.reply_text(
-            f"{get_text('sources_management_title', lang)}\n\n"
-            f"{get_text('sources_management_desc', lang)}\n\n"
-            "What would you like to do?",
-            reply_markup=get_sources_menu_keyboard(user.id),
+            _sources_menu_text(lang),
+            reply_markup=get_sources_menu_keyboard(user.id, lang),
             parse_mode='Markdown'
         )
         return CHOOSING_ACTION
     
-    with SessionLocal.begin() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
-        
-        if context.user_data.get('removing_topics') and db_user:
-            ut: UserTopic | None = (
-                session.query(UserTopic)
-                .filter(UserTopic.user_id == db_user.id, UserTopic.topic == text)
-                .first()
-            )
-            if ut:
-                session.delete(ut)
-                session.flush()
-
-                # Notify admin about topic removal
-                notifier = get_notifier()
-                if notifier:
-                    await notifier.notify_user_activity(
-                        username=user.username or str(user.id),
-                        activity_type="topics_removed",
-                        details={
-                            "topic": text,
-                            "total_count": session.query(UserTopic).filter(UserTopic.user_id == db_user.id).count()
-                        }
-                    )
-
-                tracker = get_user_tracker()
-                if tracker:
-                    tracker.update_user_activity(db_user.id)
-
-                await update.message.reply_text(
-                    get_text('topic_removed', lang, topic=text),
-                    reply_markup=get_topics_menu_keyboard(user.id)
+    if context.user_data.get('removing_topics'):
+        removed = await asyncio.to_thread(_remove_user_topic, user.id, text)
+        if removed:
+            user_id, remaining = removed
+            # Notify admin about topic removal
+            notifier = get_notifier()
+            if notifier:
+                notifier.queue_user_activity(
+                    username=user.username or str(user.id),
+                    activity_type="topics_removed",
+                    details={
+                        "topic": text,
+                        "total_count": remaining
+                    }
                 )
-            else:
-                await update.message.reply_text(
-                    get_text('topic_not_found', lang, topic=text),
-                    reply_markup=get_topics_menu_keyboard(user.id)
+
+            tracker = get_user_tracker()
+            if tracker:
+                tracker.update_user_activity(user_id)
+
+            await update.message.reply_text(
+                get_text('topic_removed', lang, topic=text),
+                reply_markup=get_topics_menu_keyboard(user.id, lang)
+            )
+        else:
+            await update.message.reply_text(
+                get_text('topic_not_found', lang, topic=text),
+                reply_markup=get_topics_menu_keyboard(user.id, lang)
+            )
+        context.user_data.pop('removing_topics', None)
+        
+    elif context.user_data.get('removing_sources'):
+        removed = await asyncio.to_thread(_remove_user_source, user.id, text)
+        if removed:
+            user_id, remaining = removed
+            # Notify admin about source removal
+            notifier = get_notifier()
+            if notifier:
+                notifier.queue_user_activity(
+                    username=user.username or str(user.id),
+                    activity_type="sources_removed",
+                    details={
+                        "source": text,
+                        "total_count": remaining
+                    }
                 )
-            context.user_data.pop('removing_topics', None)
-            
-        elif context.user_data.get('removing_sources') and db_user:
-            if db_user.sources:
-                # Find the Source object by username
-                source_to_remove = next((s for s in db_user.sources if s.username == text), None)
-                if source_to_remove:
-                    db_user.sources.remove(source_to_remove)
-                    flag_modified(db_user, "sources")  # May not be needed for relationship, but safe
-                    # Notify admin about source removal
-                    notifier = get_notifier()
-                    if notifier:
-                        await notifier.notify_user_activity(
-                            username=user.username or str(user.id),
-                            activity_type="sources_removed",
-                            details={
-                                "source": text,
-                                "total_count": len(db_user.sources)
-                            }
-                        )
 
-                    tracker = get_user_tracker()
-                    if tracker:
-                        tracker.update_user_activity(db_user.id)
-                    
-                    await update.message.reply_text(
-                        get_text('source_removed', lang, source=text),
-                        reply_markup=get_sources_menu_keyboard(user.id)
-                    )
-                else:
-                    await update.message.reply_text(
-                        get_text('source_not_found', lang, source=text),
-                        reply_markup=get_sources_menu_keyboard(user.id)
-                    )
-            context.user_data.pop('removing_sources', None)
+            tracker = get_user_tracker()
+            if tracker:
+                tracker.update_user_activity(user_id)
+            
+            await update.message.reply_text(
+                get_text('source_removed', lang, source=text),
+                reply_markup=get_sources_menu_keyboard(user.id, lang)
+            )
+        else:
+            await update.message.reply_text(
+                get_text('source_not_found', lang, source=text),
+                reply_markup=get_sources_menu_keyboard(user.id, lang)
+            )
+        context.user_data.pop('removing_sources', None)
     
     return CHOOSING_ACTION
 
@@ -1036,49 +1270,44 @@ async def handle_removal(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def view_settings(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Display user's current settings."""
     user = update.effective_user
-    lang = get_user_language(user.id)
+    lang = await get_user_language(user.id)
     
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user.id).first()
+    preferences = await asyncio.to_thread(_load_user_preferences, user.id)
+    if preferences:
+        topics, sources = preferences
         
-        if db_user:
-            topics = [ut.topic for ut in db_user.user_topics] if db_user.user_topics else []
-            sources = [s.username for s in db_user.sources] if db_user.sources else []
-            
-            topics_text = '\n• '.join(topics) if topics else "None"
-            sources_text = '\n• '.join(sources) if sources else "None"
-            
-            time_until_next = get_time_until_next_summary(lang)
-            
-            language_display = "English" if lang == Language.ENGLISH else "Українська"
-            
-            settings_message = get_text('settings_message', lang, 
-                topics_count=len(topics),
-                topics=topics_text,
-                sources_count=len(sources),
-                sources=sources_text,
-                time_remaining=time_until_next,
-                lang_display=language_display
-            )
-            if not sources:
-                settings_message += f"\n\n{get_text('settings_warning_no_sources', lang)}"
-        else:
-            settings_message = get_text('settings_not_found', lang)
+        topics_text = '\n• '.join(topics) if topics else "None"
+        sources_text = '\n• '.join(sources) if sources else "None"
+        
+        time_until_next = get_time_until_next_summary(lang)
+        
+        language_display = "English" if lang == Language.ENGLISH else "Українська"
+        
+        settings_message = get_text('settings_message', lang, 
+            topics_count=len(topics),
+            topics=topics_text,
+            sources_count=len(sources),
+            sources=sources_text,
+            time_remaining=time_until_next,
+            lang_display=language_display
+        )
+        if not sources:
+            settings_message += f"\n\n{get_text('settings_warning_no_sources', lang)}"
+    else:
+        settings_message = get_text('settings_not_found', lang)
     
     await update.message.reply_text(
         settings_message,
-        reply_markup=get_main_menu_keyboard(user.id)
+        reply_markup=get_main_menu_keyboard(user.id, lang)
     )
     return CHOOSING_ACTION
 
 
 async def unknown_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle unknown commands."""
-    try:
-        user_id = update.effective_user.id if update.effective_user else None
-        lang = get_user_language(user_id) if user_id else Language.ENGLISH
-    except Exception:
-        lang = Language.ENGLISH
+    # Fallback path: never hit the database just to pick a language
+    user_id = update.effective_user.id if update.effective_user else None
+    lang = get_cached_user_language(user_id)
     await update.message.reply_text(
         get_text('unknown_command', lang)
     )
@@ -1099,12 +1328,9 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     
     if update and update.effective_message:
         try:
-            # Try to get user language, fallback to English if not available
-            try:
-                user_id = update.effective_user.id if update.effective_user else None
-                lang = get_user_language(user_id) if user_id else Language.ENGLISH
-            except:
-                lang = Language.ENGLISH
+            # Use the cached language only, so error storms do not add database load
+            user_id = update.effective_user.id if update.effective_user else None
+            lang = get_cached_user_language(user_id)
             
             await update.effective_message.reply_text(
                 get_text('error_occurred', lang)
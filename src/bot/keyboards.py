@@ -1,34 +1,94 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
 from telegram import ReplyKeyboardMarkup
 from utils.i18n import Language, get_text
 from db.database import SessionLocal
 from db.models import User
 
+logger = logging.getLogger(__name__)
+
+# Language changes refresh the cache directly, so entries can live for a few minutes
+USER_CACHE_TTL_SECONDS = 300
+USER_CACHE_MAX_SIZE = 10_000
+
+
+def _parse_admin_chat_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+# Read and parsed once at import; db.database has already loaded .env by this point
+_ADMIN_CHAT_ID = _parse_admin_chat_id(os.getenv("ADMIN_CHAT_ID"))
+
+# telegram_id -> (user_id, language, cached_at)
+_user_cache: "OrderedDict[int, Tuple[int, Language, float]]" = OrderedDict()
+
+
+def cache_user(telegram_id: int, user_id: int, language: Language) -> None:
+    """Store a user's id and language in the lookup cache."""
+    _user_cache[telegram_id] = (user_id, language, time.monotonic())
+    _user_cache.move_to_end(telegram_id)
+    while len(_user_cache) > USER_CACHE_MAX_SIZE:
+        _user_cache.popitem(last=False)
+
 
-def get_user_language(user_id: int) -> Language:
-    """Get user's preferred language from database."""
+def invalidate_user_cache(telegram_id: int) -> None:
+    """Drop a cached user entry so the next lookup hits the database."""
+    _user_cache.pop(telegram_id, None)
+
+
+def _load_user(telegram_id: int) -> Optional[Tuple[int, Language]]:
     with SessionLocal() as session:
-        db_user = session.query(User).filter(User.telegram_id == user_id).first()
-        if db_user and db_user.language:
-            return Language(db_user.language)
+        row = session.query(User.id, User.language).filter(User.telegram_id == telegram_id).first()
+    return (row.id, row.language) if row else None
+
+
+async def get_cached_user(telegram_id: int) -> Optional[Tuple[int, Language]]:
+    """Return (user_id, language) for a Telegram user, querying the database in a thread on cache miss."""
+    cached = _user_cache.get(telegram_id)
+    if cached and time.monotonic() - cached[2] < USER_CACHE_TTL_SECONDS:
+        _user_cache.move_to_end(telegram_id)
+        return cached[0], cached[1]
+
+    row = await asyncio.to_thread(_load_user, telegram_id)
+    if not row:
+        invalidate_user_cache(telegram_id)
+        return None
+    cache_user(telegram_id, *row)
+    return row
+
+
+async def get_user_language(user_id: int) -> Language:
+    """Get user's preferred language from the cache, falling back to the database."""
+    cached = await get_cached_user(user_id)
+    return cached[1] if cached else Language.ENGLISH
+
+
+def get_cached_user_language(telegram_id: Optional[int]) -> Language:
+    """Get a user's language from the cache only, defaulting to English without touching the database."""
+    cached = _user_cache.get(telegram_id) if telegram_id else None
+    if not cached:
+        logger.debug(f"Language cache miss for {telegram_id}, using English")
         return Language.ENGLISH
+    return cached[1]
 
 
 def is_admin_user(user_id: int) -> bool:
     """Check if the user is an admin based on ADMIN_CHAT_ID."""
-    import os
-    admin_chat_id = os.getenv("ADMIN_CHAT_ID")
-    if not admin_chat_id:
-        return False
-    try:
-        return str(user_id) == str(admin_chat_id)
-    except (ValueError, TypeError):
-        return False
+    return _ADMIN_CHAT_ID is not None and user_id == _ADMIN_CHAT_ID
 
 
-def get_main_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    """Get main menu keyboard based on user permissions."""
-    lang = get_user_language(user_id)
-    
+# Keyboards depend only on language (and admin rights), so the immutable markups are built once and shared
+@lru_cache(maxsize=8)
+def _main_menu_keyboard(lang: Language, is_admin: bool) -> ReplyKeyboardMarkup:
     keyboard = [
         [get_text('btn_manage_sources', lang), get_text('btn_manage_topics', lang)],
         [get_text('btn_view_settings', lang), get_text('btn_change_language', lang)],
@@ -36,15 +96,14 @@ def get_main_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
     ]
     
     # Add testing menu only for admin users
-    if is_admin_user(user_id):
+    if is_admin:
         keyboard.append([get_text('btn_testing', lang)])
     
     return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
 
 
-def get_testing_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    """Get testing menu keyboard."""
-    lang = get_user_language(user_id)
+@lru_cache(maxsize=8)
+def _testing_menu_keyboard(lang: Language) -> ReplyKeyboardMarkup:
     keyboard = [
         [get_text('btn_run_collection', lang), get_text('btn_generate_summaries', lang)],
         [get_text('btn_back_main', lang)]
@@ -52,9 +111,8 @@ def get_testing_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
 
 
-def get_topics_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    """Get topics menu keyboard."""
-    lang = get_user_language(user_id)
+@lru_cache(maxsize=8)
+def _topics_menu_keyboard(lang: Language) -> ReplyKeyboardMarkup:
     keyboard = [
         [get_text('btn_add_topics', lang), get_text('btn_remove_topics', lang)],
         [get_text('btn_view_topics', lang), get_text('btn_back_main', lang)]
@@ -62,9 +120,8 @@ def get_topics_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
 
 
-def get_sources_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    """Get sources menu keyboard."""
-    lang = get_user_language(user_id)
+@lru_cache(maxsize=8)
+def _sources_menu_keyboard(lang: Language) -> ReplyKeyboardMarkup:
     keyboard = [
         [get_text('btn_add_sources', lang), get_text('btn_remove_sources', lang)],
         [get_text('btn_view_sources', lang), get_text('btn_back_main', lang)]
@@ -72,11 +129,35 @@ def get_sources_menu_keyboard(user_id: int) -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
 
 
-def get_language_selection_keyboard(user_id: int) -> ReplyKeyboardMarkup:
-    """Get language selection keyboard."""
-    lang = get_user_language(user_id)
+@lru_cache(maxsize=8)
+def _language_selection_keyboard(lang: Language) -> ReplyKeyboardMarkup:
     keyboard = [
         [get_text('btn_ukrainian', lang), get_text('btn_english', lang)],
         [get_text('btn_back_main', lang)]
     ]
-    return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
\ No newline at end of file
+    return ReplyKeyboardMarkup(keyboard, one_time_keyboard=True)
+
+
+def get_main_menu_keyboard(user_id: int, lang: Optional[Language] = None) -> ReplyKeyboardMarkup:
+    """Get main menu keyboard based on user permissions."""
+    return _main_menu_keyboard(lang or get_user_language(user_id), is_admin_user(user_id))
+
+
+def get_testing_menu_keyboard(user_id: int, lang: Optional[Language] = None) -> ReplyKeyboardMarkup:
+    """Get testing menu keyboard."""
+    return _testing_menu_keyboard(lang or get_user_language(user_id))
+
+
+def get_topics_menu_keyboard(user_id: int, lang: Optional[Language] = None) -> ReplyKeyboardMarkup:
+    """Get topics menu keyboard."""
+    return _topics_menu_keyboard(lang or get_user_language(user_id))
+
+
+def get_sources_menu_keyboard(user_id: int, lang: Optional[Language] = None) -> ReplyKeyboardMarkup:
+    """Get sources menu keyboard."""
+    return _sources_menu_keyboard(lang or get_user_language(user_id))
+
+
+def get_language_selection_keyboard(user_id: int, lang: Optional[Language] = None) -> ReplyKeyboardMarkup:
+    """Get language selection keyboard."""
+    return _language_selection_keyboard(lang or get_user_language(user_id))
@@ -1,7 +1,10 @@
+import asyncio
 import os
 import logging
 import time
-from typing import List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
 from datetime import time as dt_time
 from dotenv import load_dotenv
 from telegram import Update
@@ -13,24 +16,26 @@ from telegram.ext import (
     ContextTypes,
     filters
 )
+from telegram.request import HTTPXRequest
 from zoneinfo import ZoneInfo
 
 from db.database import SessionLocal, create_tables
-from db.models import User, ProcessingStats
-from sqlalchemy import func
+from db.models import User, ProcessingStats, Summary, UserTopic
+from sqlalchemy import bindparam, func, lambda_stmt, select
 from db.qdrant_utils import cleanup_old_vectors
-from pipeline.collector import run_collection
+from pipeline.collector import run_collection, close_shared_collector
 from pipeline.filter import filter_messages_async
-from pipeline.summarizer import generate_summaries_async, get_user_summaries
+from pipeline.summarizer import generate_summaries_async, get_user_summaries_bulk
 from utils.monitoring import Notifier, set_notifier, get_notifier
 from utils.user_tracker import init_user_tracker, get_user_tracker
 from utils.logging_config import setup_logging
-from utils.text_utils import split_text_safely
-from utils.stats_tracker import get_user_stats, calculate_time_saved, format_time_duration
+from utils.text_utils import split_text_cached
+from utils.stats_tracker import get_user_stats_bulk, calculate_time_saved, format_time_duration
 from utils.i18n import Language, get_text
+from utils.telegram_sender import send_message_limited
 
 from .handlers import (
-    start, unknown_command, error_handler, prompt_start,
+    start, unknown_command, error_handler, prompt_start, load_users_total,
     main_menu_handler, add_topics, add_sources, handle_removal, handle_language_selection,
     CHOOSING_ACTION, ADDING_TOPICS, ADDING_SOURCES, REMOVING_ITEMS, SELECTING_LANGUAGE
 )
@@ -45,7 +50,7 @@ async def collect_and_filter_messages(context: ContextTypes.DEFAULT_TYPE) -> Non
     
     notifier = get_notifier()
     if notifier:
-        await notifier.notify_system_performance("collection_started", {"is_initial": False})
+        notifier.queue_system_performance("collection_started", {"is_initial": False})
 
     try:
         collected_total, collected_stats = await run_collection()
@@ -60,25 +65,73 @@ async def collect_and_filter_messages(context: ContextTypes.DEFAULT_TYPE) -> Non
         logger.info("Collection and filtering finished")
         
         if notifier:
-            await notifier.notify_system_performance("collection_completed", {
-                "duration": round(collection_duration, 2),
-                "messages_collected": collected_total,
-                "messages_processed": collected_stats.get("messages_processed", "N/A"),
-                "skipped_empty": collected_stats.get("skipped_empty", "N/A"),
-                "skipped_old": collected_stats.get("skipped_old", "N/A"),
-            })
-            await notifier.notify_system_performance("filtering_completed", {
-                "duration": round(filtering_duration, 2),
-                "filtered_messages": filter_result.get("messages_filtered", "N/A"),
-                "users_processed": filter_result.get("users_processed", "N/A"),
-                "topics_matched": filter_result.get("topics_matched", "N/A"),
-            })
+            notifier.queue_collection_results(
+                collection_duration, collected_total, collected_stats,
+                filtering_duration, filter_result,
+            )
     except Exception as e:
         logger.exception(f"Collection and filtering failed: {e}")
         if notifier:
             await notifier.notify_error("Collection/Filtering", str(e), {"is_initial": False})
 
 
+USER_SCAN_BATCH_SIZE = 500
+BOT_CONNECTION_POOL_SIZE = 64
+
+# Compiled once and served from SQLAlchemy's statement cache on every scheduled run
+_TOTALS_FOR_DAY = lambda_stmt(
+    lambda: select(
+        func.coalesce(func.sum(ProcessingStats.messages_collected), 0),
+        func.coalesce(func.sum(ProcessingStats.messages_filtered), 0),
+    ).where(ProcessingStats.date == bindparam("day"))
+)
+_DISTRIBUTION_USERS = lambda_stmt(
+    lambda: select(User).where(User.telegram_id.isnot(None))
+)
+
+
+def _get_users_with_topics(user_ids: List[int]) -> Set[int]:
+    """Return which of the given users have at least one topic, without loading UserTopic rows."""
+    if not user_ids:
+        return set()
+    with SessionLocal() as session:
+        return set(session.scalars(
+            select(UserTopic.user_id).where(UserTopic.user_id.in_(user_ids)).distinct()
+        ))
+
+
+@dataclass(frozen=True)
+class NoUpdatesTemplate:
+    """Translated pieces of the daily "no updates" message; only the numbers are filled in per user."""
+
+    nothing_interesting: str
+    stats_header: str
+    collected_label: str
+    filtered_label: str
+    matched_topics_suffix: str
+    sources_label: str
+    time_saved_label: str
+    vs_manual_suffix: str
+    efficiency_label: str
+    efficiency_suffix: str
+
+
+@lru_cache(maxsize=8)
+def _no_updates_template(lang: Language) -> NoUpdatesTemplate:
+    return NoUpdatesTemplate(
+        nothing_interesting=get_text("nothing_interesting", lang),
+        stats_header=f"\n\n{get_text('stats_title', lang)}",
+        collected_label=get_text("stats_messages_collected", lang),
+        filtered_label=get_text("stats_messages_filtered", lang),
+        matched_topics_suffix=get_text("stats_matched_topics_suffix", lang),
+        sources_label=get_text("stats_sources_processed", lang),
+        time_saved_label=get_text("stats_time_saved", lang),
+        vs_manual_suffix=f" ({get_text('stats_vs_manual', lang)})",
+        efficiency_label=get_text("stats_efficiency", lang),
+        efficiency_suffix=get_text("stats_efficiency_suffix", lang),
+    )
+
+
 async def send_daily_summaries(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Generate and send daily summaries to all users."""
     logger.info("Running daily summary job")
@@ -96,14 +149,7 @@ async def send_daily_summaries(context: ContextTypes.DEFAULT_TYPE) -> None:
         try:
             from datetime import datetime, timezone
             today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-            agg = (
-                session.query(
-                    func.coalesce(func.sum(ProcessingStats.messages_collected), 0),
-                    func.coalesce(func.sum(ProcessingStats.messages_filtered), 0),
-                )
-                .filter(ProcessingStats.date == today)
-                .one()
-            )
+            agg = session.execute(_TOTALS_FOR_DAY, {"day": today}).one()
             total_collected, total_filtered = agg[0], agg[1]
             if (total_collected or 0) <= 0 and (total_filtered or 0) <= 0:
                 should_skip_generation = True
@@ -123,109 +169,159 @@ async def send_daily_summaries(context: ContextTypes.DEFAULT_TYPE) -> None:
     else:
         logger.info("Skipping summary generation due to zero collection/filtering today")
         if notifier:
-            await notifier.notify_system_performance(
+            notifier.queue_system_performance(
                 "summaries_generated",
                 {"summaries_count": 0, "users_count": "N/A", "duration": 0, "skipped": True},
             )
 
-    with SessionLocal() as session:
-        users: List[User] = session.query(User).filter(User.telegram_id.isnot(None)).all()
-        users_count = len(users)
-        tracker = get_user_tracker()
+    tracker = get_user_tracker()
 
-        for user in users:
-            if tracker and user.telegram_id in tracker.blocked_users:
-                logger.info(f"Skipping user {user.id} (blocked bot)")
-                continue
-            
-            summaries = get_user_summaries(user.id, days_back=1)
-            if not summaries:
-                try:
-                    user_lang = Language(user.language) if getattr(user, "language", None) else Language.ENGLISH
-                except Exception:
-                    user_lang = Language.ENGLISH
-                user_stats = get_user_stats(user.id, days_back=1)
-                time_analysis = calculate_time_saved(user_stats) if user_stats else None
-                stats_lines: list[str] = []
-                if user_stats and time_analysis:
-                    stats_lines.append(f"\n\n{get_text('stats_title', user_lang)}")
-                    if hasattr(user_stats, "messages_collected"):
-                        stats_lines.append(f"{get_text('stats_messages_collected', user_lang)} {user_stats.messages_collected}")
-                    has_topics = bool(getattr(user, "user_topics", []))
-                    if has_topics and hasattr(user_stats, "messages_filtered"):
-                        matched = getattr(user_stats, "topics_matched", 0)
-                        stats_lines.append(
-                            f"{get_text('stats_messages_filtered', user_lang)} {user_stats.messages_filtered} ("
-                            + get_text('stats_matched_topics_suffix', user_lang, count=matched)
-                            + ")"
-                        )
-                    if not has_topics and hasattr(user_stats, "sources_processed"):
-                        stats_lines.append(f"{get_text('stats_sources_processed', user_lang)} {user_stats.sources_processed}")
-                    if time_analysis.get("time_saved", 0) > 0:
-                        stats_lines.append(
-                            f"{get_text('stats_time_saved', user_lang)} ~{format_time_duration(time_analysis['time_saved'], user_lang)} ("
-                            + get_text('stats_vs_manual', user_lang)
-                            + ")"
-                        )
-                        stats_lines.append(
-                            f"{get_text('stats_efficiency', user_lang)} {time_analysis['efficiency_ratio']:.1f}"
-                            + get_text('stats_efficiency_suffix', user_lang)
-                        )
-                message_no_updates = get_text('nothing_interesting', user_lang) + ("\n".join(stats_lines) if stats_lines else "")
-                try:
-                    await context.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=message_no_updates,
+    async def send_to_user(
+        user: User, summary: Optional[Summary], user_stats: Optional[ProcessingStats], has_topics: bool
+    ) -> Tuple[bool, bool]:
+        """Send the summary (or 'no updates' note) to one user.
+
+        Returns (had_summary, delivered).
+        """
+        # A send error elsewhere in this job may have marked the user blocked after their batch was filtered
+        if tracker and user.telegram_id in tracker.blocked_users:
+            logger.info(f"Skipping user {user.id} (blocked bot)")
+            return bool(summary), False
+
+        if not summary:
+            user_lang = user.language
+            time_analysis = calculate_time_saved(user_stats) if user_stats else None
+            template = _no_updates_template(user_lang)
+            stats_lines: list[str] = []
+            if user_stats and time_analysis:
+                stats_lines.append(template.stats_header)
+                if hasattr(user_stats, "messages_collected"):
+                    stats_lines.append(f"{template.collected_label} {user_stats.messages_collected}")
+                if has_topics and hasattr(user_stats, "messages_filtered"):
+                    matched = getattr(user_stats, "topics_matched", 0)
+                    stats_lines.append(
+                        f"{template.filtered_label} {user_stats.messages_filtered} "
+                        f"({template.matched_topics_suffix.format(count=matched)})"
                     )
-                    logger.info(f"Sent 'no updates' message to user {user.id} (chat {user.telegram_id})")
-                    sent_count += 1
-                except Exception as e:
-                    if tracker:
-                        await tracker.handle_message_send_error(e, user.telegram_id, user.username)
-                    logger.error(
-                        f"Failed to send 'no updates' message to user {user.id} (chat {user.telegram_id}): {e}"
+                if not has_topics and hasattr(user_stats, "sources_processed"):
+                    stats_lines.append(f"{template.sources_label} {user_stats.sources_processed}")
+                if time_analysis.get("time_saved", 0) > 0:
+                    stats_lines.append(
+                        f"{template.time_saved_label} ~{format_time_duration(time_analysis['time_saved'], user_lang)}"
+                        + template.vs_manual_suffix
                     )
-                    failed_count += 1
-                continue
-
-            summary = summaries[0]
-            summaries_count += 1
-            message_text = summary.content
-
-            # Split text safely to avoid breaking formatting entities
-            chunks = split_text_safely(message_text, max_chunk_size=4096)
-            user_failed = False
-            for chunk in chunks:
-                try:
-                    await context.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=chunk,
-                        parse_mode="HTML",
+                    stats_lines.append(
+                        f"{template.efficiency_label} {time_analysis['efficiency_ratio']:.1f}"
+                        + template.efficiency_suffix
                     )
-                except Exception as e:
-                    if tracker:
-                        await tracker.handle_message_send_error(e, user.telegram_id, user.username)
-                    logger.error(
-                        f"Failed to send summary chunk to user {user.id} (chat {user.telegram_id}): {e}"
+            message_no_updates = template.nothing_interesting + ("\n".join(stats_lines) if stats_lines else "")
+            try:
+                await send_message_limited(
+                    context.bot,
+                    chat_id=user.telegram_id,
+                    text=message_no_updates,
+                )
+                logger.info(f"Sent 'no updates' message to user {user.id} (chat {user.telegram_id})")
+                return False, True
+            except Exception as e:
+                if tracker:
+                    await tracker.handle_message_send_error(e, user.telegram_id, user.username)
+                logger.error(
+                    f"Failed to send 'no updates' message to user {user.id} (chat {user.telegram_id}): {e}"
+                )
+                return False, False
+
+        # Split text safely to avoid breaking formatting entities
+        chunks = await asyncio.to_thread(split_text_cached, summary.content, 4096)
+        for chunk in chunks:
+            try:
+                await send_message_limited(
+                    context.bot,
+                    chat_id=user.telegram_id,
+                    text=chunk,
+                    parse_mode="HTML",
+                )
+            except Exception as e:
+                if tracker:
+                    await tracker.handle_message_send_error(e, user.telegram_id, user.username)
+                logger.error(
+                    f"Failed to send summary chunk to user {user.id} (chat {user.telegram_id}): {e}"
+                )
+                return True, False
+        return True, True
+
+    async def send_batch(users: List[User]) -> List[Tuple[User, object]]:
+        blocked = frozenset(tracker.blocked_users) if tracker else frozenset()
+        recipients = [user for user in users if user.telegram_id not in blocked]
+        skipped_blocked = len(users) - len(recipients)
+        if skipped_blocked:
+            logger.info(f"Skipping {skipped_blocked} users (blocked bot)")
+
+        # A failing batch is reported and counted here so the task group doesn't cancel the other batches
+        try:
+            # Bulk queries per batch instead of summary, stats and topic lookups per user
+            user_ids = [user.id for user in recipients]
+            summaries_by_user, stats_by_user, users_with_topics = await asyncio.gather(
+                asyncio.to_thread(get_user_summaries_bulk, user_ids, 1),
+                asyncio.to_thread(get_user_stats_bulk, user_ids, 1),
+                asyncio.to_thread(_get_users_with_topics, user_ids),
+            )
+
+            # Users are sent to concurrently; send_message_limited enforces Telegram's global and per-chat limits
+            results = await asyncio.gather(
+                *(
+                    send_to_user(
+                        user, summaries_by_user.get(user.id), stats_by_user.get(user.id), user.id in users_with_topics
                     )
-                    user_failed = True
-                    break
-            
-            if user_failed:
+                    for user in recipients
+                ),
+                return_exceptions=True,
+            )
+            return list(zip(recipients, results))
+        except Exception as e:
+            logger.exception(f"Failed to deliver summaries to a batch of {len(recipients)} users: {e}")
+            if notifier:
+                await notifier.notify_error("Summary Delivery", str(e), {"batch_size": len(recipients)})
+            return [(user, e) for user in recipients]
+
+    # Users are streamed in batches so the first batch is being sent while later ones are still fetched;
+    # send_batch handles its own failures, so the task group only cancels in-flight batches if the scan fails
+    batch_tasks: List["asyncio.Task[List[Tuple[User, object]]]"] = []
+    async with asyncio.TaskGroup() as tg:
+        with SessionLocal() as session:
+            users_result = session.scalars(
+                _DISTRIBUTION_USERS,
+                execution_options={"stream_results": True, "yield_per": USER_SCAN_BATCH_SIZE},
+            )
+            for users in users_result.partitions():
+                users_count += len(users)
+                batch_tasks.append(tg.create_task(send_batch(users)))
+                await asyncio.sleep(0)
+
+    for batch_task in batch_tasks:
+        for user, result in batch_task.result():
+            if isinstance(result, Exception):
+                logger.error(f"Failed to deliver summary to user {user.id}: {result}")
                 failed_count += 1
-            else:
+                continue
+            had_summary, delivered = result
+            if had_summary:
+                summaries_count += 1
+            if delivered:
                 sent_count += 1
-    
+            else:
+                failed_count += 1
+
     total_duration = time.time() - start_time
     
     # Notify admin about summary generation and sending
     if notifier:
-        await notifier.notify_system_performance("summaries_generated", {
+        notifier.queue_system_performance("summaries_generated", {
             "summaries_count": summaries_count,
             "users_count": users_count,
             "duration": round(generation_duration, 2)
         })
-        await notifier.notify_system_performance("summaries_sent", {
+        notifier.queue_system_performance("summaries_sent", {
             "sent_count": sent_count,
             "failed_count": failed_count
         })
@@ -241,7 +337,7 @@ async def cleanup_old_vectors_job(context: ContextTypes.DEFAULT_TYPE, days_to_ke
         await cleanup_old_vectors(days_to_keep=days_to_keep)
         
         if notifier:
-            await notifier.notify_system_performance("cleanup_completed", {
+            notifier.queue_system_performance("cleanup_completed", {
                 "vectors_cleaned": "N/A"  # Would need to modify cleanup_old_vectors to return count
             })
     except Exception as e:
@@ -266,6 +362,21 @@ async def check_inactive_users_job(context: ContextTypes.DEFAULT_TYPE) -> None:
                 await notifier.notify_error("Inactive Users Check", str(e))
 
 
+async def flush_notifications(application: Application) -> None:
+    """Send pending notifications while the bot can still reach Telegram."""
+    notifier = get_notifier()
+    if notifier:
+        await notifier.flush()
+
+
+async def shutdown_clients(application: Application) -> None:
+    """Release long-lived clients and the notification worker when the bot stops."""
+    await close_shared_collector()
+    notifier = get_notifier()
+    if notifier:
+        await notifier.close()
+
+
 def main() -> None:
     """Run the bot."""
     load_dotenv()
@@ -277,7 +388,24 @@ def main() -> None:
         logger.error("BOT_TOKEN environment variable not set!")
         return
     
-    application = Application.builder().token(token).build()
+    # One warm HTTP/2 pool sized for the daily bulk send, so sending at Telegram's rate limit does not churn connections
+    bot_request = HTTPXRequest(
+        connection_pool_size=BOT_CONNECTION_POOL_SIZE,
+        http_version="2",
+        pool_timeout=30,
+        connect_timeout=10,
+        read_timeout=30,
+        write_timeout=30,
+    )
+    # post_stop runs before the bot's HTTP client is shut down; post_shutdown runs after it
+    application = (
+        Application.builder()
+        .token(token)
+        .request(bot_request)
+        .post_stop(flush_notifications)
+        .post_shutdown(shutdown_clients)
+        .build()
+    )
 
     notifier = Notifier(application.bot)
     set_notifier(notifier)
@@ -357,6 +485,7 @@ def main() -> None:
     
     # Initialize database
     create_tables()
+    load_users_total()
     
     logger.info("Bot started successfully!")
     
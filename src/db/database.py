@@ -1,7 +1,9 @@
-from sqlalchemy import create_engine, event
+from sqlalchemy import Column, MetaData, String, Table, create_engine, delete, event, insert, select
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import CreateIndex, CreateTable
 from db.models import Base
+import hashlib
 import os
 from dotenv import load_dotenv
 from sqlite3 import Connection as SQLite3Connection
@@ -33,8 +35,35 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
+# Kept outside Base.metadata; remembers the DDL signature create_tables last applied
+_schema_state = Table("schema_state", MetaData(), Column("signature", String(64), primary_key=True))
+
+
+def _schema_signature() -> str:
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        ddl.extend(str(CreateIndex(index).compile(dialect=engine.dialect)) for index in table.indexes)
+    return hashlib.sha256(";".join(ddl).encode()).hexdigest()
+
+
 def create_tables():
+    """Create missing tables and indexes, skipping the per-table checks when the schema is unchanged."""
+    signature = _schema_signature()
+    _schema_state.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        if conn.execute(select(_schema_state.c.signature)).scalar() == signature:
+            return
+
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add indexes introduced after a table was created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        conn.execute(delete(_schema_state))
+        conn.execute(insert(_schema_state).values(signature=signature))
 
 
 def get_session() -> Session:
@@ -48,4 +77,7 @@ def _set_sqlite_pragmas(dbapi_connection, connection_record):
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB, negative means KiB
         cursor.close()
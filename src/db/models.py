@@ -1,16 +1,58 @@
+import json
+from array import array
 from datetime import datetime
 from typing import List, Optional
 from sqlalchemy import (
-    JSON, ForeignKey, String, Text, DateTime, func, BigInteger, Float,
-    UniqueConstraint, Integer, Table, Column
+    ForeignKey, String, Text, DateTime, func, BigInteger, Float, LargeBinary,
+    UniqueConstraint, Integer, Table, Column, Index
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, validates
+from sqlalchemy.types import TypeDecorator
+
+from utils.i18n import Language, language_from_code
 
 
 class Base(DeclarativeBase):
     pass
 
 
+class LanguageType(TypeDecorator):
+    """Stores a Language as its two-letter code and loads it back as the enum."""
+    impl = String(2)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return value.value if isinstance(value, Language) else language_from_code(value).value
+
+    def process_result_value(self, value, dialect):
+        return language_from_code(value)
+
+
+class Float32Vector(TypeDecorator):
+    """Stores a float vector as packed float32 bytes instead of JSON text."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return array("f", value).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Rows written before the switch still hold a JSON array
+        if isinstance(value, list):
+            return value
+        if isinstance(value, str):
+            return json.loads(value)
+        vector = array("f")
+        vector.frombytes(value)
+        return vector.tolist()
+
+
 user_sources = Table(
     "user_sources",
     Base.metadata,
@@ -26,7 +68,7 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     telegram_id: Mapped[Optional[int]] = mapped_column(BigInteger, unique=True, nullable=True)
     username: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
-    language: Mapped[str] = mapped_column(String(2), default="en", nullable=False)  # User's preferred language
+    language: Mapped[Language] = mapped_column(LanguageType, default=Language.ENGLISH, nullable=False)  # User's preferred language
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -41,6 +83,10 @@ class User(Base):
         cascade="all, delete-orphan",
     )
 
+    @validates("language")
+    def _validate_language(self, key: str, value) -> Language:
+        return value if isinstance(value, Language) else language_from_code(value)
+
 
 class Source(Base):
     """Model for storing unique Telegram sources/channels"""
@@ -65,7 +111,7 @@ class UserTopic(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     topic: Mapped[str] = mapped_column(String(255), nullable=False)
-    embedding: Mapped[Optional[List[float]]] = mapped_column(JSON, nullable=True)
+    embedding: Mapped[Optional[List[float]]] = mapped_column(Float32Vector, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -93,6 +139,7 @@ class Message(Base):
     
     __table_args__ = (
         UniqueConstraint('source_id', 'telegram_id', name='_source_message_uc'),
+        Index("ix_messages_source_date", "source_id", "message_date"),
     )
 
 
@@ -112,11 +159,12 @@ class FilteredMessage(Base):
 
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="filtered_messages")
-    original_message: Mapped["Message"] = relationship("Message", back_populates="filtered_versions")
-    source: Mapped["Source"] = relationship("Source", back_populates="filtered_messages")
+    original_message: Mapped["Message"] = relationship("Message", back_populates="filtered_versions", lazy="raise")
+    source: Mapped["Source"] = relationship("Source", back_populates="filtered_messages", lazy="raise")
 
     __table_args__ = (
         UniqueConstraint("user_id", "message_id", "topic", name="_user_message_topic_uc"),
+        Index("ix_filtered_messages_user_date", "user_id", "message_date"),
     )
 
 
@@ -164,3 +212,7 @@ class Summary(Base):
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="summaries")
+
+    __table_args__ = (
+        Index("ix_summaries_user_created", "user_id", "created_at"),
+    )
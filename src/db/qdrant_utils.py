@@ -1,29 +1,53 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Any
 import asyncio
 import os
 import logging
 from datetime import datetime, timedelta, timezone
 
+import httpx
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models as qmodels
 
-from db.database import SessionLocal
-from db.models import Message
-
 logger = logging.getLogger(__name__)
 
 _qdrant_client: AsyncQdrantClient | None = None
 
+QDRANT_TIMEOUT_SECONDS = 60
+# Keep warm connections between jobs so upsert/search/delete bursts skip the TLS handshake
+QDRANT_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120)
+QDRANT_GRPC_OPTIONS = {
+    "grpc.keepalive_time_ms": 30_000,
+    "grpc.max_send_message_length": 64 << 20,
+}
+# Small batches with a couple of requests in flight keep serialization overlapped with server-side writes
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "64"))
+QDRANT_UPSERT_CONCURRENCY = int(os.getenv("QDRANT_UPSERT_CONCURRENCY", "2"))
+_upsert_semaphore = asyncio.Semaphore(QDRANT_UPSERT_CONCURRENCY)
+# Qdrant's default indexing_threshold (in kB), used when the collection has no explicit threshold to restore
+DEFAULT_INDEXING_THRESHOLD = 20_000
+
 
 def _create_client() -> AsyncQdrantClient:
     url = os.getenv("QDRANT_URL")
     api_key = os.getenv("QDRANT_API_KEY")
+    prefer_grpc = os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true"
+    grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
 
     if url:
-        logger.info("Connecting to remote Qdrant instance at %s", url)
-        return AsyncQdrantClient(url=url, api_key=api_key)
+        logger.info("Connecting to remote Qdrant instance at %s (%s)", url, "gRPC" if prefer_grpc else "HTTP/2")
+        return AsyncQdrantClient(
+            url=url,
+            api_key=api_key,
+            prefer_grpc=prefer_grpc,
+            grpc_port=grpc_port,
+            grpc_options=QDRANT_GRPC_OPTIONS,
+            timeout=QDRANT_TIMEOUT_SECONDS,
+            http2=True,
+            limits=QDRANT_HTTP_LIMITS,
+        )
 
     raise ValueError("No QDRANT_URL provided")
 
@@ -94,38 +118,83 @@ async def upsert_message_vectors(
     payloads: List[Dict[str, Any]] | None = None,
     collection_name: str = "tg-summarizer",
 ) -> None:
+    """Upsert vectors in parallel micro-batches without waiting for Qdrant to apply them.
+
+    Call flush_qdrant() once the job is done when the points must be searchable.
+    """
     if not message_ids:
         return
 
-    client = get_qdrant_client()
-
     if payloads is None:
         payloads = [{} for _ in message_ids]
 
+    points = [
+        qmodels.PointStruct(id=m_id, vector=vec, payload=pld)
+        for m_id, vec, pld in zip(message_ids, vectors, payloads)
+    ]
+    await asyncio.gather(*(
+        _upsert_batch(collection_name, points[i:i + QDRANT_UPSERT_BATCH_SIZE])
+        for i in range(0, len(points), QDRANT_UPSERT_BATCH_SIZE)
+    ))
+
+    logger.info("Queued %d vectors for Qdrant collection '%s'", len(points), collection_name)
+
+
+async def _upsert_batch(collection_name: str, points: List[qmodels.PointStruct]) -> None:
+    client = get_qdrant_client()
     attempt = 0
     last_err: Exception | None = None
-    while attempt < 3:
-        try:
-            await client.upsert(
-                collection_name=collection_name,
-                points=[
-                    qmodels.PointStruct(id=m_id, vector=vec, payload=pld)
-                    for m_id, vec, pld in zip(message_ids, vectors, payloads)
-                ],
-                wait=True,
-            )
-            last_err = None
-            break
-        except Exception as e:
-            last_err = e
-            logger.warning("Qdrant upsert attempt %d failed: %s", attempt + 1, e)
-            await asyncio.sleep(2 ** attempt)
-            attempt += 1
-    if last_err is not None:
-        logger.exception("Qdrant upsert failed after retries: %s", last_err)
-        raise last_err
-
-    logger.info("Upserted %d vectors into Qdrant collection '%s'", len(message_ids), collection_name) 
+    async with _upsert_semaphore:
+        while attempt < 3:
+            try:
+                await client.upsert(collection_name=collection_name, points=points, wait=False)
+                return
+            except Exception as e:
+                last_err = e
+                logger.warning("Qdrant upsert attempt %d failed: %s", attempt + 1, e)
+                await asyncio.sleep(2 ** attempt)
+                attempt += 1
+    logger.exception("Qdrant upsert failed after retries: %s", last_err)
+    raise last_err
+
+
+async def flush_qdrant(collection_name: str = "tg-summarizer") -> None:
+    """Block until previously queued updates to the collection have been applied."""
+    client = get_qdrant_client()
+    # Updates are applied in order, so an empty wait=True upsert returns once earlier ones are done
+    await client.upsert(collection_name=collection_name, points=[], wait=True)
+
+
+@asynccontextmanager
+async def indexing_paused(collection_name: str = "tg-summarizer") -> AsyncIterator[None]:
+    """Turn off vector indexing while the body bulk-upserts, then restore the previous threshold."""
+    client = get_qdrant_client()
+    restore_threshold: int | None = None
+    try:
+        info = await client.get_collection(collection_name)
+        current = info.config.optimizer_config.indexing_threshold
+        # 0 means a previous run died while paused; don't carry that forward
+        restore_threshold = current or DEFAULT_INDEXING_THRESHOLD
+        await client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=qmodels.OptimizersConfigDiff(indexing_threshold=0),
+        )
+    except Exception as e:
+        logger.warning(f"Could not pause indexing for collection '{collection_name}': {e}")
+        restore_threshold = None
+
+    try:
+        yield
+    finally:
+        if restore_threshold is not None:
+            try:
+                await client.update_collection(
+                    collection_name=collection_name,
+                    optimizers_config=qmodels.OptimizersConfigDiff(indexing_threshold=restore_threshold),
+                )
+            except Exception as e:
+                logger.exception(f"Failed to re-enable indexing for collection '{collection_name}': {e}")
+
 
 async def cleanup_old_vectors(
     collection_name: str = "tg-summarizer",
@@ -146,26 +215,36 @@ async def cleanup_old_vectors(
     client = get_qdrant_client()
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
     
-    with SessionLocal() as session:
-        old_message_ids = session.query(Message.id).filter(
-            Message.message_date < cutoff_date
-        ).all()
-        
-        old_ids = [msg_id[0] for msg_id in old_message_ids]
+    # Filter on the indexed message_date_ts payload field so no ids have to be read from the database
+    old_points_filter = qmodels.Filter(
+        must=[
+            qmodels.FieldCondition(
+                key="message_date_ts",
+                range=qmodels.Range(lt=int(cutoff_date.timestamp())),
+            )
+        ]
+    )
+    
+    count_result = await client.count(
+        collection_name=collection_name,
+        count_filter=old_points_filter,
+        exact=True,
+    )
+    total = count_result.count
     
-    if not old_ids:
+    if not total:
         logger.info("No old vectors to cleanup")
         return 0
     
     if dry_run:
-        logger.info(f"Would delete {len(old_ids)} vectors older than {cutoff_date}")
-        return len(old_ids)
+        logger.info(f"Would delete {total} vectors older than {cutoff_date}")
+        return total
     
     await client.delete(
         collection_name=collection_name,
-        points_selector=qmodels.PointIdsList(points=old_ids),
+        points_selector=qmodels.FilterSelector(filter=old_points_filter),
         wait=True,
     )
     
-    logger.info(f"Cleaned up {len(old_ids)} old vectors from collection '{collection_name}'")
-    return len(old_ids)
\ No newline at end of file
+    logger.info(f"Cleaned up {total} old vectors from collection '{collection_name}'")
+    return total
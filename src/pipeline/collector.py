@@ -1,22 +1,24 @@
 import os
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any, Tuple
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 import logging
 import time
 
 from telethon import TelegramClient
 from telethon.tl.types import Channel
+from telethon.utils import get_input_peer
 from telethon.errors import SessionPasswordNeededError, FloodWaitError
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
 from dotenv import load_dotenv
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from db.database import SessionLocal
 from db.models import User, Message, Source
-from db.qdrant_utils import ensure_collection, upsert_message_vectors
-from utils.embedder import get_embeddings, get_embedding_dimension, get_embedder_info
+from db.qdrant_utils import ensure_collection, flush_qdrant, indexing_paused, upsert_message_vectors
+from utils.embedder import EMBED_COALESCE_MAX_TEXTS, get_embedding_batcher, get_embedding_dimension, get_embedder_info
 from utils.text_utils import clean_text
 from utils.stats_tracker import StatsTracker
 from utils.user_tracker import get_user_tracker
@@ -30,6 +32,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of sources collected at the same time
+COLLECT_CONCURRENCY = int(os.getenv("COLLECT_CONCURRENCY", "4"))
+# Messages handed from the Telegram fetch to the save/embed stage at a time;
+# matches the embedding batcher's request size so one batch fills one embeddings call
+COLLECT_BATCH_SIZE = EMBED_COALESCE_MAX_TEXTS
+PIPELINE_QUEUE_SIZE = 2
+
+# (message ids, vectors, payloads) ready for upsert_message_vectors
+EmbeddedBatch = Tuple[List[int], List[List[float]], List[Dict[str, Any]]]
+
+
+def _as_utc(dt: datetime) -> datetime:
+    """Return dt as an aware UTC datetime; Telethon already returns UTC, which is passed through as is."""
+    if dt.tzinfo is timezone.utc:
+        return dt
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _new_collection_stats() -> Dict[str, int]:
+    return {
+        "messages_processed": 0,
+        "messages_collected": 0,
+        "skipped_empty": 0,
+        "skipped_old": 0
+    }
+
+
+def _new_follower_stats() -> Dict[str, float]:
+    return {
+        "messages_collected": 0,
+        "messages_processed": 0,
+        "sources_processed": 0,
+        "collection_time": 0.0,
+    }
+
+
+def _save_follower_stats(follower_stats: Dict[int, Dict[str, float]]) -> None:
+    """Write each follower's collection totals for the run with a single stats update."""
+    for user_id, totals in follower_stats.items():
+        try:
+            StatsTracker(user_id=user_id).update_collection_stats(
+                messages_collected=int(totals["messages_collected"]),
+                messages_processed=int(totals["messages_processed"]),
+                sources_processed=int(totals["sources_processed"]),
+                collection_time=totals["collection_time"],
+            )
+        except Exception as e:
+            logger.exception(f"Failed to save collection stats for user {user_id}: {e}")
+
+
 class TelegramCollector:
     """Collects messages from Telegram channels using Telethon"""
     
@@ -50,6 +104,12 @@ class TelegramCollector:
         
         self.client = TelegramClient(self.session_name, self.api_id, self.api_hash)
         self.qdrant_collection_created = False
+        # Cleared while Telegram has us in flood wait so every concurrent source pauses, not just one
+        self._flood_wait_over = asyncio.Event()
+        self._flood_wait_over.set()
+        # Resolved channels by username, so each source costs at most one get_entity RPC per collector
+        self._entity_cache: Dict[str, Dict[str, Any]] = {}
+        self._input_peers: Dict[str, Any] = {}
         
         try:
             embedder_info = get_embedder_info()
@@ -101,6 +161,9 @@ class TelegramCollector:
     
     async def get_entity_info(self, source_username: str) -> Optional[Dict[str, Any]]:
         """Get entity information from source identifier"""
+        cached = self._entity_cache.get(source_username)
+        if cached:
+            return cached
         try:
             entity = await self.client.get_entity(source_username)
             
@@ -112,6 +175,8 @@ class TelegramCollector:
                     "type": "channel"
                 }
                 logger.info(f"✓ Found channel: {entity.title} (@{entity.username}) - ID: {entity.id}")
+                self._entity_cache[source_username] = info
+                self._input_peers[source_username] = get_input_peer(entity)
                 return info
             else:
                 logger.warning(f"Unsupported entity type for {source_username}: {type(entity)} - only channels are supported")
@@ -121,6 +186,19 @@ class TelegramCollector:
             logger.exception(f"Failed to resolve Telegram entity for {source_username}: {e}")
             return None
     
+    def _warm_entity_cache(self, sources: List[Source]) -> None:
+        """Seed the entity cache from stored sources; they were validated as channels when added.
+
+        Telethon resolves their usernames from its session file when messages are fetched.
+        """
+        for source in sources:
+            if source.username and source.title and source.username not in self._entity_cache:
+                self._entity_cache[source.username] = {
+                    "title": source.title,
+                    "username": source.username,
+                    "type": "channel",
+                }
+
     def _get_or_create_source(self, session: Session, entity_info: Dict[str, Any]) -> Source:
         """Get existing source or create new one"""
         source = session.query(Source).filter(Source.username == entity_info.get("username")).first()
@@ -141,63 +219,51 @@ class TelegramCollector:
         
         return source
     
-    async def collect_messages_from_source(
+    async def iter_message_batches(
         self,
         source_username: str,
+        stats: Dict[str, int],
         limit: Optional[int] = None,
         offset_date: Optional[datetime] = None,
-        min_date: Optional[datetime] = None
-    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
-        """Collect messages from a specific source with time filtering and return stats"""
-        messages = []
-        stats = {
-            "messages_processed": 0,
-            "messages_collected": 0,
-            "skipped_empty": 0,
-            "skipped_old": 0
-        }
-        
+        min_date: Optional[datetime] = None,
+        batch_size: int = COLLECT_BATCH_SIZE,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield a source's messages in batches as they arrive from Telegram, updating stats in place."""
+        source_name = source_username
+        batch: List[Dict[str, Any]] = []
         try: 
+            await self._flood_wait_over.wait()
             entity_info = await self.get_entity_info(source_username)
             if not entity_info:
                 logger.error(f"Could not resolve entity for source: {source_username}")
-                return messages, stats
+                return
             
             source_name = entity_info.get("title")
             
             async for message in self.client.iter_messages(
-                source_username,
+                self._input_peers.get(source_username, source_username),
                 limit=limit or 1000,
                 offset_date=offset_date,
                 reverse=False
             ):
                 stats["messages_processed"] += 1
                 
-                # Normalize Telethon datetime to UTC-aware before comparisons
-                msg_dt = message.date
-                if msg_dt.tzinfo is None:
-                    msg_dt = msg_dt.replace(tzinfo=timezone.utc)
-                else:
-                    msg_dt = msg_dt.astimezone(timezone.utc)
-
+                # The date check stays first: messages arrive newest first, so the first old one ends the scan
+                msg_dt = _as_utc(message.date)
                 if min_date and msg_dt < min_date:
                     stats["skipped_old"] += 1
                     break
                 
-                if not message.text:
+                text = message.text
+                if not text:
                     stats["skipped_empty"] += 1
                     continue
                 
-                
-                message_data = {
-                    "telegram_id": message.id,
-                    "content": message.text,
-                    "message_date": msg_dt,
-                    "entity_info": entity_info,  # Only for source creation
-                }
-                
-                messages.append(message_data)
+                batch.append({"telegram_id": message.id, "content": text, "message_date": msg_dt})
                 stats["messages_collected"] += 1
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
             
             logger.info(f"Collection summary for {source_name}:")
             logger.info(f"  - Total messages processed: {stats['messages_processed']}")
@@ -206,12 +272,17 @@ class TelegramCollector:
             logger.info(f"  - Skipped (too old): {stats['skipped_old']}")
             
         except FloodWaitError as e:
-            logger.warning(f"Rate limited for {e.seconds} seconds. Waiting...")
-            await asyncio.sleep(e.seconds)
+            logger.warning(f"Rate limited for {e.seconds} seconds. Pausing collection...")
+            self._flood_wait_over.clear()
+            try:
+                await asyncio.sleep(e.seconds)
+            finally:
+                self._flood_wait_over.set()
         except Exception as e:
             logger.exception(f"Error collecting messages from {source_name}: {e}")
         
-        return messages, stats
+        if batch:
+            yield batch
     
     async def collect_messages_for_all_sources(
         self,
@@ -225,29 +296,38 @@ class TelegramCollector:
             logger.error("UserStatusTracker is not initialized.")
             return
 
-        with SessionLocal() as session:
-            users = session.query(User).all()
-            threshold_date = utc_now() - timedelta(days=inactive_days_threshold)
-            active_users = []
-            for user in users:
-                if user.telegram_id in getattr(user_tracker, 'blocked_users', set()):
-                    continue
-                last_seen = getattr(user_tracker, 'last_activity', {}).get(user.id)
-                if not last_seen:
-                    last_seen = user.created_at
-                last_seen = to_utc(last_seen)
-                if last_seen and last_seen < threshold_date:
-                    continue
-                active_users.append(user)
+        threshold_date = utc_now() - timedelta(days=inactive_days_threshold)
+        blocked_ids = frozenset(getattr(user_tracker, 'blocked_users', set()))
+        # In-memory activity wins over created_at; activity never predates creation, so a user is
+        # active if created after the threshold or seen after it
+        recently_active_ids = [
+            user_id
+            for user_id, last_seen in getattr(user_tracker, 'last_activity', {}).items()
+            if to_utc(last_seen) >= threshold_date
+        ]
 
-            source_set = {}
-            for user in active_users:
-                for source in user.sources:
-                    if source.username:
-                        source_set[source.username] = source
-            sources = list(source_set.values())
+        with SessionLocal() as session:
+            query = (
+                session.query(Source)
+                .join(Source.users)
+                .filter(
+                    Source.username.isnot(None),
+                    or_(
+                        User.created_at.is_(None),
+                        User.created_at >= threshold_date,
+                        User.id.in_(recently_active_ids),
+                    ),
+                )
+                .distinct()
+                # Followers are needed afterwards for per-user collection stats
+                .options(selectinload(Source.users))
+            )
+            if blocked_ids:
+                query = query.filter(or_(User.telegram_id.is_(None), User.telegram_id.notin_(blocked_ids)))
+            sources: List[Source] = query.all()
 
         logger.info(f"Found {len(sources)} unique sources from active users.")
+        self._warm_entity_cache(sources)
         now = utc_now()
         min_date = (now - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
         logger.info(f"Collecting messages from {len(sources)} sources since {min_date}.")
@@ -260,62 +340,118 @@ class TelegramCollector:
             "skipped_old": 0,
         }
 
-        for i, source in enumerate(sources, 1):
-            logger.info(f"[{i}/{len(sources)}] Processing source: {source.username}")
-            try:
-                source_start_time = time.time()
-                messages, source_stats = await self.collect_messages_from_source(
-                    source_username=source.username,
-                    limit=limit_per_source,
-                    min_date=min_date
+        semaphore = asyncio.Semaphore(COLLECT_CONCURRENCY)
+        follower_stats: Dict[int, Dict[str, float]] = {}
+
+        async def process_limited(index: int, source: Source) -> Tuple[int, Dict[str, int]]:
+            async with semaphore:
+                return await self._process_source(
+                    source, index, len(sources), limit_per_source, min_date, follower_stats
                 )
-                new_messages: List[Message] = []
-                if messages:
-                    with SessionLocal.begin() as session:
-                        new_messages = self._save_messages_to_db(session, messages)
-                    if new_messages:
-                        await self._upsert_message_embeddings_async(new_messages, source.username)
-                source_elapsed_time = time.time() - source_start_time
-
-                # Update per-user collection stats for this processed source
-                # - messages_collected: number of new messages saved for this source
-                # - messages_processed: total messages scanned for this source
-                # - sources_processed: increment by 1 for each follower of this source
-                new_count = len(new_messages)
-                processed_count = source_stats.get("messages_processed", 0)
-                # Update aggregates
-                total_new_messages += new_count
-                for key in aggregate_stats.keys():
-                    aggregate_stats[key] += source_stats.get(key, 0)
-                # Fetch fresh source with users in a new session
-                with SessionLocal() as session:
-                    db_source: Optional[Source] = (
-                        session.query(Source).filter(Source.username == source.username).first()
-                    )
-                    if db_source and db_source.users:
-                        followers_count = len(db_source.users)
-                        per_user_collection_time = (
-                            source_elapsed_time / followers_count if followers_count > 0 else 0.0
-                        )
-                        for follower in db_source.users:
-                            tracker = StatsTracker(user_id=follower.id)
-                            tracker.update_collection_stats(
-                                messages_collected=new_count,
-                                messages_processed=processed_count,
-                                sources_processed=1,
-                                collection_time=per_user_collection_time,
-                            )
-                if not messages:
-                    logger.info(f"No new messages found for source {source.username}")
-            except Exception as e:
-                logger.exception(f"Failed to process source {source.username}: {e}")
+
+        # Sources are collected concurrently; Telegram, embedding and Qdrant waits overlap across sources.
+        # Indexing is paused meanwhile so Qdrant builds the index once instead of after every batch
+        async with indexing_paused():
+            results = await asyncio.gather(
+                *(process_limited(i, source) for i, source in enumerate(sources, 1)),
+                return_exceptions=True,
+            )
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to process source {source.username}: {result}")
                 continue
+            new_count, source_stats = result
+            total_new_messages += new_count
+            for key in aggregate_stats.keys():
+                aggregate_stats[key] += source_stats.get(key, 0)
+
+        if total_new_messages:
+            try:
+                await flush_qdrant()
+            except Exception as e:
+                logger.exception(f"Failed to flush pending Qdrant upserts: {e}")
+        if follower_stats:
+            await asyncio.to_thread(_save_follower_stats, follower_stats)
         logger.info("Collection complete!")
 
         return total_new_messages, aggregate_stats
 
+    async def _process_source(
+        self,
+        source: Source,
+        index: int,
+        total: int,
+        limit_per_source: int,
+        min_date: datetime,
+        follower_stats: Dict[int, Dict[str, float]],
+    ) -> Tuple[int, Dict[str, int]]:
+        """Collect, store and embed one source's messages and add them to its followers' totals in follower_stats.
+
+        Returns (new messages saved, collection stats for the source).
+        """
+        logger.info(f"[{index}/{total}] Processing source: {source.username}")
+        try:
+            source_start_time = time.time()
+            source_stats = _new_collection_stats()
+            new_count = 0
+            # Telegram fetch, DB save + embedding, and Qdrant upsert run as overlapping stages;
+            # the small queues keep a fast stage from running far ahead of a slow one
+            save_queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]" = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            upsert_queue: "asyncio.Queue[Optional[EmbeddedBatch]]" = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+            async def fetch_stage() -> None:
+                async for batch in self.iter_message_batches(
+                    source.username, source_stats, limit=limit_per_source, min_date=min_date
+                ):
+                    await save_queue.put(batch)
+                await save_queue.put(None)
+
+            async def save_stage() -> None:
+                nonlocal new_count
+                while (batch := await save_queue.get()) is not None:
+                    # Batches are only yielded after the channel was resolved into the entity cache
+                    entity_info = self._entity_cache[source.username]
+                    with SessionLocal.begin() as session:
+                        new_messages = self._save_messages_to_db(session, batch, entity_info)
+                    new_count += len(new_messages)
+                    embedded = await self._embed_messages_async(new_messages, source.username)
+                    if embedded:
+                        await upsert_queue.put(embedded)
+                await upsert_queue.put(None)
+
+            async def upsert_stage() -> None:
+                while (embedded := await upsert_queue.get()) is not None:
+                    await self._upsert_embedded_batch(embedded, source.username)
+
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(fetch_stage())
+                tg.create_task(save_stage())
+                tg.create_task(upsert_stage())
+            source_elapsed_time = time.time() - source_start_time
+
+            # Add this source to each follower's collection totals; they are written once per run
+            # - messages_collected: number of new messages saved for this source
+            # - messages_processed: total messages scanned for this source
+            # - sources_processed: increment by 1 for each follower of this source
+            processed_count = source_stats.get("messages_processed", 0)
+            # Followers were eager-loaded with the source, so no query is needed here
+            if source.users:
+                per_user_collection_time = source_elapsed_time / len(source.users)
+                for follower in source.users:
+                    totals = follower_stats.setdefault(follower.id, _new_follower_stats())
+                    totals["messages_collected"] += new_count
+                    totals["messages_processed"] += processed_count
+                    totals["sources_processed"] += 1
+                    totals["collection_time"] += per_user_collection_time
+            if not source_stats["messages_collected"]:
+                logger.info(f"No new messages found for source {source.username}")
+            return new_count, source_stats
+        except Exception as e:
+            logger.exception(f"Failed to process source {source.username}: {e}")
+            return 0, {}
+
     def _save_messages_to_db(
-        self, session: Session, messages: List[Dict[str, Any]]
+        self, session: Session, messages: List[Dict[str, Any]], entity_info: Dict[str, Any]
     ) -> List[Message]:
         """Saves a list of messages to the database using a single batched INSERT.
 
@@ -328,7 +464,6 @@ class TelegramCollector:
             return []
 
         # Resolve or create the Source once for this batch (all messages share the same source)
-        entity_info = messages[0]["entity_info"]
         source = self._get_or_create_source(session, entity_info)
 
         rows = [
@@ -374,10 +509,12 @@ class TelegramCollector:
         )
         return inserted_messages
 
-    async def _upsert_message_embeddings_async(self, new_messages: List[Message], source_username: Optional[str] = None):
-        """Generates and upserts embeddings for new messages asynchronously."""
+    async def _embed_messages_async(
+        self, new_messages: List[Message], source_username: Optional[str] = None
+    ) -> Optional[EmbeddedBatch]:
+        """Generate embeddings and Qdrant payloads for new messages; returns None if there is nothing to upsert."""
         if not new_messages:
-            return
+            return None
         src_display = f"@{source_username}" if source_username else f"source_id={new_messages[0].source_id}"
         try:
             await self._ensure_qdrant_collection_async()
@@ -390,38 +527,68 @@ class TelegramCollector:
                     message_texts.append(cleaned_text)
             if not valid_messages:
                 logger.warning(f"No valid messages with content found for {src_display}")
-                return
+                return None
             if len(valid_messages) != len(new_messages):
                 logger.info(f"Filtered out {len(new_messages) - len(valid_messages)} empty messages for {src_display}")
-            vectors = await asyncio.to_thread(get_embeddings, message_texts)
+            # Shared with the other sources being collected concurrently
+            vectors = await get_embedding_batcher().embed(message_texts)
             if not vectors:
                 logger.warning(f"No embeddings generated for {src_display}")
-                return
+                return None
             ids = [m.id for m in valid_messages]
-            payloads = []
-            for message in valid_messages:
-                dt = message.message_date
-                if dt is None:
-                    ts = None
-                else:
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    else:
-                        dt = dt.astimezone(timezone.utc)
-                    ts = int(dt.timestamp())
-                payloads.append({
+            payloads = [
+                {
                     "source_id": message.source_id,
-                    "message_date_ts": ts if ts is not None else 0,
-                })
+                    "message_date_ts": int(_as_utc(message.message_date).timestamp()) if message.message_date else 0,
+                }
+                for message in valid_messages
+            ]
+            return ids, vectors, payloads
+        except Exception as e:
+            logger.exception("Failed to embed messages for %s: %s", src_display, e)
+            return None
+
+    async def _upsert_embedded_batch(self, embedded: EmbeddedBatch, source_username: Optional[str] = None):
+        """Upsert vectors produced by _embed_messages_async into Qdrant."""
+        ids, vectors, payloads = embedded
+        src_display = f"@{source_username}" if source_username else f"{len(ids)} messages"
+        try:
             await upsert_message_vectors(ids, vectors, payloads)
-            logger.info(f"Successfully upserted {len(valid_messages)} vectors for {src_display}")
+            logger.info(f"Successfully upserted {len(ids)} vectors for {src_display}")
         except Exception as e:
             logger.exception("Failed to upsert vectors to Qdrant for %s: %s", src_display, e)
 
+_shared_collector: Optional[TelegramCollector] = None
+_shared_collector_lock = asyncio.Lock()
+
+
+async def get_shared_collector() -> TelegramCollector:
+    """Return a connected collector reused by bot handlers and collection runs instead of connecting per request."""
+    global _shared_collector
+    async with _shared_collector_lock:
+        if _shared_collector is None or not _shared_collector.client.is_connected():
+            collector = TelegramCollector()
+            if not await collector.authenticate():
+                await collector.__aexit__(None, None, None)
+                raise RuntimeError("Failed to authenticate with Telegram")
+            _shared_collector = collector
+        return _shared_collector
+
+
+async def close_shared_collector() -> None:
+    """Disconnect the shared collector, if one was created."""
+    global _shared_collector
+    async with _shared_collector_lock:
+        if _shared_collector is not None:
+            await _shared_collector.__aexit__(None, None, None)
+            _shared_collector = None
+
+
 async def run_collection():
     """Entrypoint for running the Telegram message collection pipeline."""
     logger.info(f"Starting run_collection")
-    async with TelegramCollector() as collector:
-        result = await collector.collect_messages_for_all_sources()
+    # Reuse the bot's connected client: a second client on the same session file would contend for its SQLite lock
+    collector = await get_shared_collector()
+    result = await collector.collect_messages_for_all_sources()
     logger.info("run_collection completed.")
     return result
@@ -1,16 +1,20 @@
 import asyncio
 import argparse
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
 
-from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Row, select, update
+from sqlalchemy.orm import Session, selectinload
 
 from db.database import SessionLocal
 from db.models import FilteredMessage, Message, User, UserTopic
 from db.qdrant_utils import get_qdrant_client
 from qdrant_client.http import models as qmodels
 from utils.embedder import get_embeddings
+from utils.datetime_utils import start_of_utc_day, to_utc, utc_now
 from utils.stats_tracker import track_filtering_time
 from dotenv import load_dotenv
 
@@ -23,21 +27,92 @@ DEFAULT_TOP_K_PER_TOPIC = 30
 DEFAULT_SCORE_THRESHOLD = 0.3
 
 
+def _save_filter_results(
+    user_id: int,
+    new_embeddings: Dict[int, List[float]],
+    hits: List[Tuple[str, int, float]],
+) -> List[str]:
+    """Persist newly computed topic embeddings (keyed by UserTopic id) and the user's hits in a single transaction.
+
+    Returns the topic of every newly inserted FilteredMessage row.
+    """
+    with SessionLocal.begin() as session:
+        if new_embeddings:
+            # ORM bulk UPDATE by primary key: one executemany, no SELECT of the rows first
+            session.execute(
+                update(UserTopic),
+                [{"id": topic_id, "embedding": vec} for topic_id, vec in new_embeddings.items()],
+            )
+        if not hits:
+            return []
+        return _insert_filtered_messages(session, user_id, hits)
+
+
+def _insert_filtered_messages(
+    session: Session,
+    user_id: int,
+    hits: List[Tuple[str, int, float]],
+) -> List[str]:
+    """Insert (topic, message_id, score) hits as FilteredMessage rows in one statement.
+
+    Hits are already limited to the user's sources and date window by the Qdrant filter.
+    Hits whose message is gone are dropped, and rows that already exist are ignored via
+    the (user_id, message_id, topic) unique constraint.
+    Returns the topic of every newly inserted row.
+    """
+    messages: Dict[int, Message] = {
+        msg.id: msg
+        for msg in session.query(Message).filter(Message.id.in_({message_id for _, message_id, _ in hits}))
+    }
+    rows = [
+        {
+            "user_id": user_id,
+            "message_id": message_id,
+            "source_id": messages[message_id].source_id,
+            "topic": topic,
+            "content": messages[message_id].content,
+            "message_date": messages[message_id].message_date,
+            "similarity_score": score,
+        }
+        for topic, message_id, score in hits
+        if message_id in messages
+    ]
+    if not rows:
+        return []
+
+    stmt = sqlite_insert(FilteredMessage).on_conflict_do_nothing(
+        index_elements=[
+            FilteredMessage.__table__.c.user_id,
+            FilteredMessage.__table__.c.message_id,
+            FilteredMessage.__table__.c.topic,
+        ]
+    )
+    try:
+        # RETURNING reports only the rows that were actually inserted
+        return list(session.scalars(stmt.returning(FilteredMessage.topic), rows))
+    except SQLAlchemyError:
+        # Fallback when RETURNING is not supported by the SQLite library; duplicates are counted too
+        session.execute(stmt, rows)
+        return [row["topic"] for row in rows]
+
+
 async def _filter_for_user(
     user: User,
+    user_topics: List[Row],
     date_threshold: datetime,
     top_k_per_topic: int,
     score_threshold: float,
 ) -> Tuple[int, int]:
     """Filter messages for a single user based on their topics via Qdrant.
 
+    user_topics holds the user's (id, topic, embedding) rows.
+
     Returns a tuple: (messages_filtered_count, unique_topics_matched)
     """
-    if not user.user_topics:
+    if not user_topics:
         return 0, 0
 
-    user_topics_list: List[UserTopic] = list(user.user_topics)
-    topics: List[str] = [ut.topic for ut in user_topics_list]
+    topics: List[str] = [ut.topic for ut in user_topics]
     if not topics:
         return 0, 0
 
@@ -49,43 +124,61 @@ async def _filter_for_user(
         return 0, 0
 
     topic_to_vector: Dict[str, List[float]] = {}
-    topics_needing_embeddings: List[str] = []
-    for ut in user_topics_list:
+    topics_needing_embeddings: List[Row] = []
+    new_embeddings: Dict[int, List[float]] = {}
+    for ut in user_topics:
         if ut.embedding:
             topic_to_vector[ut.topic] = ut.embedding
         else:
-            topics_needing_embeddings.append(ut.topic)
+            topics_needing_embeddings.append(ut)
 
     if topics_needing_embeddings:
         try:
-            new_vectors = await asyncio.to_thread(get_embeddings, topics_needing_embeddings)
+            new_vectors = await asyncio.to_thread(get_embeddings, [ut.topic for ut in topics_needing_embeddings])
         except Exception as e:
             logger.exception(f"Failed to generate embeddings for user {user.id}: {e}")
             new_vectors = []
 
-        if new_vectors:
-            with SessionLocal.begin() as session:
-                for topic, vec in zip(topics_needing_embeddings, new_vectors):
-                    topic_to_vector[topic] = vec
-                    ut = (
-                        session.query(UserTopic)
-                        .filter(UserTopic.user_id == user.id, UserTopic.topic == topic)
-                        .first()
-                    )
-                    if ut:
-                        ut.embedding = vec
+        # Saved together with the hits below rather than in a transaction of their own,
+        # keyed by the already-loaded row ids so the UPDATE needs no lookup
+        for ut, vec in zip(topics_needing_embeddings, new_vectors):
+            new_embeddings[ut.id] = vec
+            topic_to_vector[ut.topic] = vec
 
-    client = get_qdrant_client()
+    hits = await _search_topic_hits(
+        user.id, topics, topic_to_vector, source_ids, date_threshold, top_k_per_topic, score_threshold
+    )
+    # Each (message, topic) pair is looked up and inserted once; rows saved by earlier runs are skipped by the unique index
+    seen: Set[Tuple[int, str]] = set()
+    unique_hits: List[Tuple[str, int, float]] = []
+    for topic, message_id, score in hits:
+        if (message_id, topic) not in seen:
+            seen.add((message_id, topic))
+            unique_hits.append((topic, message_id, score))
+    hits = unique_hits
+    if not hits and not new_embeddings:
+        return 0, 0
+
+    inserted_topics = await asyncio.to_thread(
+        _save_filter_results, user.id, new_embeddings, hits
+    )
+    return len(inserted_topics), len(set(inserted_topics))
 
-    messages_filtered = 0
-    topics_with_hits: set[str] = set()
 
-    # Only search messages from user's sources and not older than date_threshold (UTC seconds)
-    date_threshold_utc = date_threshold
-    if date_threshold_utc.tzinfo is None:
-        date_threshold_utc = date_threshold_utc.replace(tzinfo=timezone.utc)
-    else:
-        date_threshold_utc = date_threshold_utc.astimezone(timezone.utc)
+async def _search_topic_hits(
+    user_id: int,
+    topics: List[str],
+    topic_to_vector: Dict[str, List[float]],
+    source_ids: List[int],
+    date_threshold: datetime,
+    top_k_per_topic: int,
+    score_threshold: float,
+) -> List[Tuple[str, int, float]]:
+    """Search Qdrant for every topic at once and return (topic, message_id, score) hits."""
+    client = get_qdrant_client()
+
+    # Only search messages from user's sources and not older than date_threshold (UTC seconds);
+    # both fields are payload-indexed, so nothing needs re-checking against the database afterwards
     payload_filter = qmodels.Filter(
         must=[
             qmodels.FieldCondition(
@@ -95,74 +188,42 @@ async def _filter_for_user(
             qmodels.FieldCondition(
                 key="message_date_ts",
                 range=qmodels.Range(
-                    gte=int(date_threshold_utc.timestamp())
+                    gte=int(to_utc(date_threshold).timestamp())
                 ),
             ),
         ]
     )
 
-    for topic in topics:
-        vector = topic_to_vector.get(topic)
-        if not vector:
-            continue
-        try:
-            results = await client.search(
-                collection_name="tg-summarizer",
-                query_vector=vector,
-                limit=top_k_per_topic,
-                with_payload=True,
-                score_threshold=score_threshold,
-                query_filter=payload_filter,
-            )
-        except Exception as e:
-            logger.exception(f"Qdrant search failed for user {user.id}, topic '{topic}': {e}")
-            continue
-
-        if not results:
-            continue
-
-        with SessionLocal.begin() as session:
-            for sp in results:
-                try:
-                    message_id = int(sp.id)
-                except Exception:
-                    continue
-
-                msg: Optional[Message] = session.query(Message).options(selectinload(Message.source)).filter(Message.id == message_id).first()
-                if not msg:
-                    continue
-                if msg.message_date and msg.message_date < date_threshold:
-                    continue
-
-                if msg.source_id not in source_ids:
-                    continue
-
-                exists = (
-                    session.query(FilteredMessage)
-                    .filter(
-                        FilteredMessage.user_id == user.id,
-                        FilteredMessage.message_id == msg.id,
-                        FilteredMessage.topic == topic,
-                    )
-                    .first()
-                )
-                if exists:
-                    continue
-
-                fm = FilteredMessage(
-                    user_id=user.id,
-                    message_id=msg.id,
-                    source_id=msg.source_id,
-                    topic=topic,
-                    content=msg.content,
-                    message_date=msg.message_date,
-                    similarity_score=float(sp.score) if sp.score is not None else 0.0,
-                )
-                session.add(fm)
-                messages_filtered += 1
-                topics_with_hits.add(topic)
-
-    return messages_filtered, len(topics_with_hits)
+    searched_topics = [topic for topic in topics if topic_to_vector.get(topic)]
+    if not searched_topics:
+        return []
+
+    # All topic searches go to Qdrant in a single request; hits only need their id and score
+    requests = [
+        qmodels.QueryRequest(
+            query=topic_to_vector[topic],
+            filter=payload_filter,
+            limit=top_k_per_topic,
+            score_threshold=score_threshold,
+            with_payload=False,
+        )
+        for topic in searched_topics
+    ]
+    try:
+        responses = await client.query_batch_points(collection_name="tg-summarizer", requests=requests)
+    except Exception as e:
+        logger.exception(f"Qdrant batch search failed for user {user_id}: {e}")
+        return []
+
+    hits: List[Tuple[str, int, float]] = []
+    for topic, response in zip(searched_topics, responses):
+        for sp in response.points:
+            try:
+                message_id = int(sp.id)
+            except Exception:
+                continue
+            hits.append((topic, message_id, float(sp.score) if sp.score is not None else 0.0))
+    return hits
 
 
 async def filter_messages_async(
@@ -182,32 +243,36 @@ async def filter_messages_async(
     Returns:
         Dict with aggregate counters: {"users_processed", "messages_filtered", "topics_matched"}
     """
-    now = datetime.now(timezone.utc)
-    date_threshold = (now - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
+    date_threshold = start_of_utc_day(utc_now() - timedelta(days=days_back))
 
     with SessionLocal() as session:
-        query = session.query(User).options(
-            selectinload(User.sources),
-            selectinload(User.user_topics),
-        )
+        # Topics are read as plain column rows in one query instead of hydrating UserTopic objects
+        topic_query = select(UserTopic.user_id, UserTopic.id, UserTopic.topic, UserTopic.embedding)
         if user_id is not None:
-            query = query.filter(User.id == user_id)
-        users: List[User] = query.all()
+            topic_query = topic_query.where(UserTopic.user_id == user_id)
+        topics_by_user: Dict[int, List[Row]] = {}
+        for row in session.execute(topic_query):
+            topics_by_user.setdefault(row.user_id, []).append(row)
+
+        users: List[User] = (
+            session.query(User)
+            .options(selectinload(User.sources))
+            .filter(User.id.in_(topics_by_user))
+            .all()
+        ) if topics_by_user else []
 
     users_processed = 0
     total_messages_filtered = 0
     total_topics_matched = 0
 
     for user in users:
-        if not user.user_topics:
-            continue
-
         users_processed += 1
 
         with track_filtering_time(user.id) as tracker:
             try:
                 filtered_count, topics_matched = await _filter_for_user(
                     user=user,
+                    user_topics=topics_by_user[user.id],
                     date_threshold=date_threshold,
                     top_k_per_topic=top_k_per_topic,
                     score_threshold=score_threshold,
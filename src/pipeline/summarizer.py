@@ -3,22 +3,36 @@ import json
 import logging
 import os
 import re
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from collections import defaultdict
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
+from sqlalchemy.orm import raiseload, selectinload
 
+import httpx
 from google import genai
 from google.genai import types
 
 from db.database import SessionLocal
-from db.models import User, FilteredMessage, Summary, Message
-from utils.stats_tracker import get_user_stats, calculate_time_saved, format_time_duration
+from db.models import User, FilteredMessage, ProcessingStats, Summary, Message
+from utils.stats_tracker import get_user_stats_bulk, calculate_time_saved, format_time_duration
 from utils.i18n import Language, get_text
 
 # Configuration constants for processing
 DEFAULT_BATCH_SIZE = 10  # Maximum number of users to process concurrently
 DEFAULT_MESSAGE_CHUNK_SIZE = 50  # Number of messages to process in each chunk
+USER_PREFETCH_BATCH_SIZE = 50  # Users whose stats and messages are loaded together
+GEMINI_REQUEST_TIMEOUT = 60  # Seconds before a single Gemini call is abandoned and counted as failed
+
+# Keep-alive pool shared by the concurrent Gemini calls, sized so every in-flight user has a connection
+GEMINI_HTTP_LIMITS = httpx.Limits(
+    max_connections=DEFAULT_BATCH_SIZE * 2,
+    max_keepalive_connections=DEFAULT_BATCH_SIZE * 2,
+    keepalive_expiry=120,
+)
+
+_NON_ALNUM_RE = re.compile(r"[^a-zA-Z0-9]")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,21 +41,20 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_gemini_client():
-    """Get Gemini client using API key from environment"""
+    """Get the shared Gemini client, created from GEMINI_API_KEY on first use"""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("GEMINI_API_KEY environment variable is required")
-    return genai.Client(api_key=api_key)
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(async_client_args={"limits": GEMINI_HTTP_LIMITS}),
+    )
 
 
-def get_user_language_preference(user_id: int) -> Language:
-    """Get user's preferred language from database."""
-    with SessionLocal() as session:
-        db_user = session.query(User).filter(User.id == user_id).first()
-        if db_user and db_user.language:
-            return Language(db_user.language)
-        return Language.ENGLISH
+# (today's processing stats, time-saved analysis, preferred language) for one user
+UserContext = Tuple[Optional[ProcessingStats], Optional[Dict[str, Any]], Language]
 
 
 def get_language_instruction(language: Language) -> str:
@@ -74,71 +87,124 @@ async def generate_summaries_async(
         hour=0, minute=0, second=0, microsecond=0
     )
     
-    total_successful = 0
-    total_failed = 0
-    total_processed = 0
-    
     semaphore = asyncio.Semaphore(batch_size)
 
-    async def run_for_user(user: User):
+    async def run_for_user(user: User, user_context: UserContext, grouped_messages: Dict[str, List[Any]]):
         async with semaphore:
             try:
                 result = await _generate_summary_for_user(
-                    client, user, date_threshold, min_messages_per_topic
+                    client, user, user_context, grouped_messages, min_messages_per_topic
                 )
                 return user.id, result, None
             except Exception as exc:  # _generate_summary_for_user already logs
                 return user.id, None, exc
 
+    async def run_batch(loaded: List[Tuple[User, UserContext, Dict[str, List[Any]]]]) -> Tuple[int, int, int]:
+        """Summarize one prefetched user batch and save it; returns (processed, successful, failed)."""
+        results = await asyncio.gather(*(run_for_user(*item) for item in loaded))
+        new_summaries: List[Summary] = []
+        failed = 0
+        for uid, result, err in results:
+            if err is not None:
+                logger.error(f"Failed to generate summary for user {uid}: {err}")
+                failed += 1
+            elif result:
+                new_summaries.append(result)
+
+        # One commit per user batch, so a failure later in the run keeps the summaries already generated
+        if new_summaries:
+            await asyncio.to_thread(_save_summaries, new_summaries)
+        return len(results), len(new_summaries), failed
+
+    batch_tasks: List[asyncio.Task] = []
+    next_load: Optional[asyncio.Task] = None
     try:
-        with SessionLocal() as session:
-            user_query = (
-                session.query(User)
-                .options(selectinload(User.sources), selectinload(User.user_topics))
-            )
-            if user_id:
-                user_query = user_query.filter(User.id == user_id)
-            
-            running: set = set()
-
-            for user in user_query.yield_per(DEFAULT_MESSAGE_CHUNK_SIZE):
-                task = asyncio.create_task(run_for_user(user))
-                running.add(task)
-                if len(running) >= batch_size:
-                    done, running = await asyncio.wait(
-                        running, return_when=asyncio.FIRST_COMPLETED
-                    )
-                    for t in done:
-                        uid, result, err = await t
-                        total_processed += 1
-                        if err is not None:
-                            logger.error(
-                                f"Failed to generate summary for user {uid}: {err}"
-                            )
-                            total_failed += 1
-                        else:
-                            total_successful += 1 if result else 0
-
-            if running:
-                done, _ = await asyncio.wait(running)
-                for t in done:
-                    uid, result, err = await t
-                    total_processed += 1
-                    if err is not None:
-                        logger.error(f"Failed to generate summary for user {uid}: {err}")
-                        total_failed += 1
-                    else:
-                        total_successful += 1 if result else 0
+        users = await asyncio.to_thread(_load_users, user_id)
+        user_batches = [
+            users[i:i + USER_PREFETCH_BATCH_SIZE] for i in range(0, len(users), USER_PREFETCH_BATCH_SIZE)
+        ]
+
+        # Each batch's stats and messages load in a worker thread while the previous batch's
+        # Gemini calls are already running; the semaphore in run_for_user is the only admission gate
+        def load_batch(batch: List[User]) -> asyncio.Task:
+            return asyncio.create_task(asyncio.to_thread(_load_user_batch, batch, date_threshold))
+
+        next_load = load_batch(user_batches[0]) if user_batches else None
+        for i in range(len(user_batches)):
+            loaded = await next_load
+            next_load = load_batch(user_batches[i + 1]) if i + 1 < len(user_batches) else None
+            batch_tasks.append(asyncio.create_task(run_batch(loaded)))
+
+        batch_results = await asyncio.gather(*batch_tasks)
+        total_processed = sum(processed for processed, _, _ in batch_results)
+        total_successful = sum(successful for _, successful, _ in batch_results)
+        total_failed = sum(failed for _, _, failed in batch_results)
 
         logger.info(
             f"Summary generation completed: {total_successful} successful, {total_failed} failed out of {total_processed} total users"
         )
         
-    except Exception as e:
-        logger.exception(f"Critical error during summary generation: {e}")
+    except BaseException as e:
+        if next_load is not None:
+            next_load.cancel()
+        if isinstance(e, asyncio.CancelledError):
+            for task in batch_tasks:
+                task.cancel()
+        else:
+            logger.exception(f"Critical error during summary generation: {e}")
+        # Batches already running finish and save (or finish cancelling) before the error propagates
+        await asyncio.gather(*batch_tasks, return_exceptions=True)
         raise
 
 
+def _load_users(user_id: Optional[int] = None) -> List[User]:
+    """Load the users to summarize with their sources and topics eager-loaded."""
+    with SessionLocal() as session:
+        # raiseload makes a relationship that was not eager-loaded fail loudly instead of lazy-loading per user
+        user_query = (
+            select(User)
+            .options(selectinload(User.sources), selectinload(User.user_topics), raiseload("*"))
+        )
+        if user_id:
+            user_query = user_query.where(User.id == user_id)
+        return list(session.scalars(user_query))
+
+
+def _load_user_batch(
+    users: List[User], date_threshold: datetime
+) -> List[Tuple[User, UserContext, Dict[str, List[Any]]]]:
+    """Load stats and grouped messages for a batch of users in three queries instead of per user."""
+    user_contexts = _bulk_load_user_context(users)
+    topic_messages_by_user = _bulk_fetch_filtered_messages(
+        [user.id for user in users if user.user_topics], date_threshold
+    )
+    source_messages_by_user = _bulk_fetch_raw_messages(
+        {user.id: [source.id for source in user.sources] for user in users if not user.user_topics},
+        date_threshold,
+    )
+    return [
+        (
+            user,
+            user_contexts[user.id],
+            topic_messages_by_user.get(user.id, {})
+            if user.user_topics
+            else source_messages_by_user.get(user.id, {}),
+        )
+        for user in users
+    ]
+
+
+def _bulk_load_user_context(users: List[User]) -> Dict[int, UserContext]:
+    """Load today's stats for all users at once and pair them with time analysis and language."""
+    stats_by_user = get_user_stats_bulk([user.id for user in users])
+    contexts: Dict[int, UserContext] = {}
+    for user in users:
+        user_stats = stats_by_user.get(user.id)
+        time_analysis = calculate_time_saved(user_stats) if user_stats else None
+        contexts[user.id] = (user_stats, time_analysis, user.language)
+    return contexts
+
+
 def _filter_groups_by_min_size(
     groups: Dict[str, List[object]], min_size: int
 ) -> Dict[str, List[object]]:
@@ -149,166 +215,158 @@ def _filter_groups_by_min_size(
 async def _generate_summary_for_user(
     client: genai.Client,
     user: User,
-    date_threshold: datetime,
+    user_context: UserContext,
+    grouped_messages: Dict[str, List[Any]],
     min_messages_per_topic: int,
-) -> Optional[str]:
-    """Generate summary for a single user asynchronously"""
-    try:
-        user_stats = get_user_stats(user.id, days_back=1)
-        time_analysis = calculate_time_saved(user_stats) if user_stats else None
-        user_language = get_user_language_preference(user.id)
+) -> Optional[Summary]:
+    """Generate an unsaved summary for a single user asynchronously.
 
-        if user.user_topics:
-            # User has topics defined - use filtered messages approach
-            logger.info(
-                f"Generating topic-based summaries for user {user.id} with topics: {[ut.topic for ut in user.user_topics]}"
-            )
+    grouped_messages holds the user's prefetched messages, keyed by topic when the user
+    has topics and by source otherwise.
+    """
+    try:
+        user_stats, time_analysis, user_language = user_context
+        # Users with topics get filtered messages grouped by topic, others raw messages grouped by source
+        is_topic_based = bool(user.user_topics)
+        mode = "topic" if is_topic_based else "source"
 
-            topic_messages = _get_filtered_messages_by_topic(user.id, date_threshold)
+        if is_topic_based:
+            user_topics_list = [ut.topic for ut in user.user_topics]
+            logger.info(f"Generating topic-based summaries for user {user.id} with topics: {user_topics_list}")
+        else:
+            logger.info(f"Generating source-based summaries for user {user.id} (no topics defined)")
 
-            if not topic_messages:
-                logger.info(f"No recent filtered messages found for user {user.id}")
-                return None
+        if not grouped_messages:
+            kind = "filtered" if is_topic_based else "raw"
+            logger.info(f"No recent {kind} messages found for user {user.id}")
+            return None
 
-            relevant_topics = _filter_groups_by_min_size(
-                topic_messages, min_messages_per_topic
+        relevant_groups = _filter_groups_by_min_size(grouped_messages, min_messages_per_topic)
+        if not relevant_groups:
+            logger.info(
+                f"No {mode}s with sufficient messages (min: {min_messages_per_topic}) "
+                f"for user {user.id}"
             )
+            return None
 
-            if not relevant_topics:
-                logger.info(
-                    f"No topics with sufficient messages (min: {min_messages_per_topic}) "
-                    f"for user {user.id}"
-                )
-                return None
-
-            user_topics_list = [ut.topic for ut in user.user_topics]
+        if is_topic_based:
             summary_content = await _generate_summary_async(
-                client, relevant_topics, user_topics_list, user_language, user_stats, time_analysis
+                client, relevant_groups, user_topics_list, user_language, user_stats, time_analysis
             )
-            
-            if summary_content and "no relevant updates" not in summary_content.lower():
-                _save_summary(user.id, relevant_topics, summary_content, is_topic_based=True)
-                topics_list = list(relevant_topics.keys())
-                logger.info(f"Generated topic-based summary for user {user.id} covering topics: {topics_list}")
-                return summary_content
-            else:
-                logger.info(f"No relevant topic-based content found for user {user.id}")
-                return None
         else:
-            # User has no topics defined - use raw messages approach
-            logger.info(f"Generating source-based summaries for user {user.id} (no topics defined)")
-
-            source_messages = _get_raw_messages_by_source(user.id, date_threshold)
-
-            if not source_messages:
-                logger.info(f"No recent raw messages found for user {user.id}")
-                return None
-
-            relevant_sources = _filter_groups_by_min_size(
-                source_messages, min_messages_per_topic
+            summary_content = await _generate_summary_without_topics_async(
+                client, relevant_groups, user_language, user_stats, time_analysis
             )
 
-            if not relevant_sources:
-                logger.info(
-                    f"No sources with sufficient messages (min: {min_messages_per_topic}) "
-                    f"for user {user.id}"
-                )
-                return None
+        if summary_content and "no relevant updates" not in summary_content.lower():
+            logger.info(
+                f"Generated {mode}-based summary for user {user.id} covering {mode}s: {list(relevant_groups.keys())}"
+            )
+            return _build_summary(user.id, relevant_groups, summary_content, is_topic_based=is_topic_based)
+        logger.info(f"No relevant {mode}-based content found for user {user.id}")
+        return None
 
-            summary_content = await _generate_summary_without_topics_async(client, relevant_sources, user_language, user_stats, time_analysis)
-            
-            if summary_content and "no relevant updates" not in summary_content.lower():
-                _save_summary(user.id, relevant_sources, summary_content, is_topic_based=False)
-                sources_list = list(relevant_sources.keys())
-                logger.info(f"Generated source-based summary for user {user.id} covering sources: {sources_list}")
-                return summary_content
-            else:
-                logger.info(f"No relevant source-based content found for user {user.id}")
-                return None
-            
     except Exception as e:
         logger.exception(f"Failed to generate summary for user {user.id}: {e}")
         raise
 
 
-def _get_filtered_messages_by_topic(
-    user_id: int, 
-    date_threshold: datetime, 
-) -> Dict[str, List[FilteredMessage]]:
+def _bulk_fetch_filtered_messages(
+    user_ids: List[int],
+    date_threshold: datetime,
+) -> Dict[int, Dict[str, List[FilteredMessage]]]:
     """
-    Get filtered messages grouped by topic for a user within the date threshold.
+    Get filtered messages within the date threshold for all given users in one query,
+    grouped by user id and then by topic.
     """
+    if not user_ids:
+        return {}
+
+    user_topic_messages: Dict[int, Dict[str, List[FilteredMessage]]] = defaultdict(lambda: defaultdict(list))
     with SessionLocal() as session:
-        filtered_messages = (
-            session.query(FilteredMessage)
-            .options(selectinload(FilteredMessage.source))
-            .filter(
-                FilteredMessage.user_id == user_id,
+        stmt = (
+            select(FilteredMessage)
+            .options(selectinload(FilteredMessage.source), raiseload("*"))
+            .where(
+                FilteredMessage.user_id.in_(user_ids),
                 FilteredMessage.message_date >= date_threshold
             )
             .order_by(FilteredMessage.similarity_score.desc(), FilteredMessage.message_date.desc())
-            .yield_per(DEFAULT_MESSAGE_CHUNK_SIZE)
+            .execution_options(yield_per=DEFAULT_MESSAGE_CHUNK_SIZE)
         )
+        for msg in session.scalars(stmt):
+            user_topic_messages[msg.user_id][msg.topic].append(msg)
 
-        topic_messages: Dict[str, List[FilteredMessage]] = defaultdict(list)
-        for msg in filtered_messages:
-            topic_messages[msg.topic].append(msg)
+    return {uid: dict(topics) for uid, topics in user_topic_messages.items()}
 
-        return dict(topic_messages)
 
-
-def _get_raw_messages_by_source(
-    user_id: int, 
+def _bulk_fetch_raw_messages(
+    user_source_ids: Dict[int, List[int]],
     date_threshold: datetime,
     limit_per_source: int = 100
-) -> Dict[str, List[Message]]:
+) -> Dict[int, Dict[str, List[Message]]]:
     """
-    Get raw messages grouped by source for users without topics within the date threshold.
+    Get raw messages within the date threshold for users without topics in one query,
+    grouped by user id and then by source.
+
+    user_source_ids maps each user id to the ids of the user's already-loaded sources.
     """
+    all_source_ids = {sid for source_ids in user_source_ids.values() for sid in source_ids}
+    if not all_source_ids:
+        return {}
+
+    messages_by_source: Dict[int, List[Message]] = defaultdict(list)
+    source_keys: Dict[int, str] = {}
     with SessionLocal() as session:
-        user = session.query(User).filter(User.id == user_id).first()
-        if not user or not user.sources:
-            return {}
-        
-        user_source_ids = [source.id for source in user.sources]
-        source_messages: Dict[str, List[Message]] = defaultdict(list)
-        
-        for msg in session.query(Message).options(
-            selectinload(Message.source)
-        ).filter(
-            Message.source_id.in_(user_source_ids),
-            Message.message_date >= date_threshold
-        ).order_by(Message.message_date.desc()).yield_per(DEFAULT_MESSAGE_CHUNK_SIZE):  # Process messages in chunks
-            
-            source_key = msg.source.username if msg.source and msg.source.username else str(msg.source_id)
-            
-            if len(source_messages[source_key]) < limit_per_source:
-                source_messages[source_key].append(msg)
-        
-        return dict(source_messages)
+        stmt = (
+            select(Message)
+            .options(selectinload(Message.source), raiseload("*"))
+            .where(
+                Message.source_id.in_(all_source_ids),
+                Message.message_date >= date_threshold
+            )
+            .order_by(Message.message_date.desc())
+            .execution_options(yield_per=DEFAULT_MESSAGE_CHUNK_SIZE)  # Process messages in chunks
+        )
+        for msg in session.scalars(stmt):
+            if len(messages_by_source[msg.source_id]) < limit_per_source:
+                messages_by_source[msg.source_id].append(msg)
+                source_keys[msg.source_id] = (
+                    msg.source.username if msg.source and msg.source.username else str(msg.source_id)
+                )
+
+    # Sources shared by several users are fetched once and handed to each of them
+    return {
+        uid: {source_keys[sid]: messages_by_source[sid] for sid in source_ids if messages_by_source.get(sid)}
+        for uid, source_ids in user_source_ids.items()
+    }
+
 
+def _build_summary(user_id: int, relevant_data: Dict, summary_content: str, is_topic_based: bool = True) -> Summary:
+    """Build an unsaved Summary row; generate_summaries_async stores all of a run's summaries together"""
+    data_list = list(relevant_data.keys())
 
-def _save_summary(user_id: int, relevant_data: Dict, summary_content: str, is_topic_based: bool = True) -> None:
-    """Save summary to database synchronously"""
+    if is_topic_based:
+        # Topic-based summary
+        title = f"Daily Summary: {', '.join(data_list)}"
+        topic = ', '.join(data_list)
+    else:
+        # Source-based summary
+        title = f"Daily Summary from Sources: {', '.join(data_list)}"
+        topic = f"Sources: {', '.join(data_list)}"
+
+    return Summary(
+        user_id=user_id,
+        title=title,
+        content=summary_content,
+        topic=topic,
+    )
+
+
+def _save_summaries(summaries: List[Summary]) -> None:
+    """Insert the given summaries in a single transaction"""
     with SessionLocal.begin() as session:
-        data_list = list(relevant_data.keys())
-        
-        if is_topic_based:
-            # Topic-based summary
-            title = f"Daily Summary: {', '.join(data_list)}"
-            topic = ', '.join(data_list)
-        else:
-            # Source-based summary
-            title = f"Daily Summary from Sources: {', '.join(data_list)}"
-            topic = f"Sources: {', '.join(data_list)}"
-        
-        summary = Summary(
-            user_id=user_id,
-            title=title,
-            content=summary_content,
-            topic=topic,
-        )
-        session.add(summary)
+        session.add_all(summaries)
 
 
 def _build_topic_prompt(messages_data, user_language, extra_context):
@@ -316,15 +374,20 @@ def _build_topic_prompt(messages_data, user_language, extra_context):
     topics_list = list(messages_data.keys())
     language_instruction = get_language_instruction(user_language)
     lines: List[str] = []
+    source_names: Dict[int, str] = {}
     for topic, messages in messages_data.items():
         lines.append(f"\n## TOPIC: {topic}\n")
         for i, msg in enumerate(messages, 1):
-            source_name = (
-                msg.source.username if msg.source and msg.source.username else f"Source {msg.source_id}"
+            source_name = source_names.get(msg.source_id)
+            if source_name is None:
+                source_name = source_names[msg.source_id] = (
+                    msg.source.username if msg.source and msg.source.username else f"Source {msg.source_id}"
+                )
+            lines.append(
+                f"\n{i}. From [{source_name}] (Score: {msg.similarity_score:.3f})\n"
+                f"   Date: {msg.message_date}\n"
+                f"   Content: {msg.content}\n"
             )
-            lines.append(f"\n{i}. From [{source_name}] (Score: {msg.similarity_score:.3f})\n")
-            lines.append(f"   Date: {msg.message_date}\n")
-            lines.append(f"   Content: {msg.content}\n")
     all_messages_text = "".join(lines)
     return f"""You are an engaging news curator. Analyze the messages and create captivating summaries for relevant topics.
 
@@ -405,7 +468,6 @@ def _format_stats_block(user_stats, time_analysis, mode: str, user_language: Lan
             + f" {time_analysis['efficiency_ratio']:.1f}"
             + get_text('stats_efficiency_suffix', user_language)
         )
-    parts.append("")
     return parts
 
 
@@ -440,52 +502,41 @@ def _build_topic_to_usernames(messages_data: Dict[str, List[FilteredMessage]]) -
     return {topic_key: _collect_usernames_from_messages(msgs) for topic_key, msgs in messages_data.items()}
 
 
-def _find_key_case_insensitive(candidates: Dict[str, Any], query: str) -> Optional[str]:
-    """Return exact key from candidates matching query case-insensitively, or None."""
-    q = str(query)
-    for key in candidates.keys():
-        if str(key).lower() == q.lower():
-            return key
-    return None
-
-
 def _format_topic_result(result, messages_data, user_language, extra_context):
     user_stats = extra_context.get("user_stats")
     time_analysis = extra_context.get("time_analysis")
     topics_list = list(messages_data.keys())
     topic_to_usernames: Dict[str, List[str]] = _build_topic_to_usernames(messages_data)
+    # Built once so each summarized topic resolves its key with a dict lookup; first key wins on clashes
+    topic_keys_by_lower: Dict[str, str] = {}
+    for topic_key in topic_to_usernames:
+        topic_keys_by_lower.setdefault(str(topic_key).lower(), topic_key)
     if result.get("is_relevant", False) and result.get("topic_summaries"):
-        summary_parts = []
+        # Each entry is a paragraph without trailing newlines; paragraphs are separated by one blank line
+        summary_parts: List[str] = []
         if result.get("overall_headline"):
-            summary_parts.append(f"<b>{result['overall_headline']}</b>\n")
+            summary_parts.append(f"<b>{result['overall_headline']}</b>")
         if result.get("tldr"):
-            summary_parts.append(
-                f"<b>{get_text('label_tldr', user_language)}</b>\n {result['tldr']}\n"
-            )
+            summary_parts.append(f"<b>{get_text('label_tldr', user_language)}</b>\n {result['tldr']}")
         for ts in result["topic_summaries"]:
-            summary_parts.append(f"<u><i>{ts['topic']}</i></u>")
-            if ts.get("brief"):
-                summary_parts.append(f"{ts['brief']}\n")
+            heading = f"<u><i>{ts['topic']}</i></u>"
+            summary_parts.append(f"{heading}\n{ts['brief']}" if ts.get("brief") else heading)
             if ts.get("key_points"):
-                for point in ts["key_points"]:
-                    summary_parts.append(f"• {point}\n")
+                summary_parts.append("\n".join(f"• {point}" for point in ts["key_points"]))
             topic_name = str(ts.get("topic", ""))
             matched_topic_key = (
                 topic_name
                 if topic_name in topic_to_usernames
-                else _find_key_case_insensitive(topic_to_usernames, topic_name)
+                else topic_keys_by_lower.get(topic_name.lower())
             )
             usernames_for_topic = topic_to_usernames.get(matched_topic_key or "", [])
             if usernames_for_topic:
                 sources_text = ", ".join(usernames_for_topic)
-                summary_parts.append(
-                    f"<b>{get_text('label_sources', user_language)}</b> {sources_text}\n"
-                )
-            summary_parts.append("")
-        summary_parts.extend(
-            _format_stats_block(user_stats, time_analysis, mode="topic", user_language=user_language)
-        )
-        return "\n".join(summary_parts)
+                summary_parts.append(f"<b>{get_text('label_sources', user_language)}</b> {sources_text}")
+        stats_lines = _format_stats_block(user_stats, time_analysis, mode="topic", user_language=user_language)
+        if stats_lines:
+            summary_parts.append("\n".join(stats_lines))
+        return "\n\n".join(summary_parts)
     else:
         escaped_topics = ", ".join(t for t in topics_list)
         if user_language == Language.UKRAINIAN:
@@ -499,9 +550,7 @@ def _build_source_prompt(messages_data, user_language, extra_context):
     lines: List[str] = []
     for source_key, messages in messages_data.items():
         lines.append(f"\n## SOURCE: {source_key}\n")
-        for msg in messages:
-            lines.append(f"   Date: {msg.message_date}\n")
-            lines.append(f"   Content: {msg.content}\n")
+        lines.extend(f"   Date: {msg.message_date}\n   Content: {msg.content}\n" for msg in messages)
     all_messages_text = "".join(lines)
     return f"""You are an expert news curator and deduplication specialist. Analyze messages from various Telegram sources to create a comprehensive, non-redundant news summary.
 
@@ -559,6 +608,13 @@ STYLE:
 Respond strictly as JSON matching the provided schema."""
 
 
+def _normalize_source_key(value: str) -> str:
+    text = str(value or "").strip()
+    text = text.lstrip('@')
+    # remove non-alphanumeric to make underscores/dots/hyphens equivalent
+    return _NON_ALNUM_RE.sub("", text).lower()
+
+
 def _format_source_result(result, messages_data, user_language, extra_context):
     user_stats = extra_context.get("user_stats")
     time_analysis = extra_context.get("time_analysis")
@@ -581,51 +637,40 @@ def _format_source_result(result, messages_data, user_language, extra_context):
             display = str(source_key)
         source_display_map[str(source_key)] = display
     
-    def _normalize_source_key(value: str) -> str:
-        text = str(value or "").strip()
-        text = text.lstrip('@')
-        # remove non-alphanumeric to make underscores/dots/hyphens equivalent
-        return re.sub(r"[^a-zA-Z0-9]", "", text).lower()
+    # Normalized key -> source key, built once instead of rescanning every key per summary
+    source_keys_by_normalized: Dict[str, str] = {}
+    for key in source_display_map:
+        source_keys_by_normalized.setdefault(_normalize_source_key(key), key)
 
-    def _find_source_key_match(candidates: Dict[str, str], query: str) -> Optional[str]:
+    def _find_source_key_match(query: str) -> Optional[str]:
         # exact match first
-        if query in candidates:
+        if query in source_display_map:
             return query
-        qn = _normalize_source_key(query)
-        for key in candidates.keys():
-            if _normalize_source_key(key) == qn:
-                return key
-        return None
+        return source_keys_by_normalized.get(_normalize_source_key(query))
+
     if result.get("source_summaries"):
-        summary_parts = []
+        # Each entry is a paragraph without trailing newlines; paragraphs are separated by one blank line
+        summary_parts: List[str] = []
         if result.get("overall_headline"):
-            summary_parts.append(f"<b>{result['overall_headline']}</b>\n")
+            summary_parts.append(f"<b>{result['overall_headline']}</b>")
         if result.get("tldr"):
-            summary_parts.append(
-                f"<b>{get_text('label_tldr', user_language)}</b>\n {result['tldr']}\n"
-            )
+            summary_parts.append(f"<b>{get_text('label_tldr', user_language)}</b>\n {result['tldr']}")
         for ss in result["source_summaries"]:
             raw_source = str(ss.get("source", ""))
-            matched_key = _find_source_key_match(source_display_map, raw_source)
+            matched_key = _find_source_key_match(raw_source)
             display_source = (
                 source_display_map.get(matched_key) if matched_key is not None else f"@{raw_source.lstrip('@')}"
             )
-            summary_parts.append(f"{display_source}")
-            if ss.get("brief"):
-                summary_parts.append(f"{ss['brief']}\n")
+            summary_parts.append(f"{display_source}\n{ss['brief']}" if ss.get("brief") else display_source)
             if ss.get("key_points"):
-                for point in ss["key_points"]:
-                    summary_parts.append(f"• {point}")
+                summary_parts.append("\n".join(f"• {point}" for point in ss["key_points"]))
             if ss.get("themes"):
-                themes_text = ", ".join(t for t in ss["themes"]) 
-                summary_parts.append(
-                    f"\n<b>{get_text('label_themes', user_language)}</b> {themes_text}\n"
-                )
-            summary_parts.append("")
-        summary_parts.extend(
-            _format_stats_block(user_stats, time_analysis, mode="source", user_language=user_language)
-        )
-        return "\n".join(summary_parts)
+                themes_text = ", ".join(ss["themes"])
+                summary_parts.append(f"<b>{get_text('label_themes', user_language)}</b> {themes_text}")
+        stats_lines = _format_stats_block(user_stats, time_analysis, mode="source", user_language=user_language)
+        if stats_lines:
+            summary_parts.append("\n".join(stats_lines))
+        return "\n\n".join(summary_parts)
     else:
         escaped_sources = ", ".join(s for s in sources_list)
         if user_language == Language.UKRAINIAN:
@@ -643,32 +688,125 @@ async def _generate_summary_generic(
     result_formatter,
     extra_context=None,
 ):
-    prompt = prompt_builder(messages_data, user_language, extra_context)
+    # Building a prompt over hundreds of messages is CPU-bound, so keep it off the event loop
+    prompt = await asyncio.to_thread(prompt_builder, messages_data, user_language, extra_context)
     try:
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=response_schema,
-                temperature=0.5,
-                thinking_config=types.ThinkingConfig(thinking_budget=0),
-                automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
-            ),
-        )
+        # A stuck request would otherwise hold its semaphore slot for the rest of the run
+        async with asyncio.timeout(GEMINI_REQUEST_TIMEOUT):
+            response = await client.aio.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=response_schema,
+                    temperature=0.5,
+                    thinking_config=types.ThinkingConfig(thinking_budget=0),
+                    automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
+                ),
+            )
         if not response.text:
             raise ValueError("Empty response from Gemini API")
-        result = json.loads(response.text)
+        # Parsed in a worker thread so a large response doesn't stall the other users' tasks
+        result = await asyncio.to_thread(json.loads, response.text)
         return result_formatter(result, messages_data, user_language, extra_context)
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON response: {e}")
         logger.error(f"Raw response: {getattr(response, 'text', None)}")
         raise ValueError(f"Failed to parse JSON response: {e}")
+    except TimeoutError:
+        logger.error(f"Gemini request timed out after {GEMINI_REQUEST_TIMEOUT}s")
+        raise
     except Exception as e:
         logger.exception(f"Gemini API error: {e}")
         raise
 
 
+# Built once; a prebuilt Schema is copied by the SDK rather than processed (and mutated) like a dict
+TOPIC_RESPONSE_SCHEMA = types.Schema.model_validate({
+    "type": "object",
+    "properties": {
+        "overall_headline": {
+            "type": "string",
+            "description": "Compelling main headline that captures the most significant news across all topics"
+        },
+        "tldr": {
+            "type": "string",
+            "description": "Concise 2-3 sentence summary capturing the essence of all major developments"
+        },
+        "is_relevant": {
+            "type": "boolean",
+            "description": "Whether there is truly valuable, non-redundant information matching any user interests"
+        },
+        "topic_summaries": {
+            "type": "array",
+            "description": "Array of summaries for each relevant topic (empty if not relevant)",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "topic": {"type": "string"},
+                    "brief": {
+                        "type": "string",
+                        "description": "Concise, engaging paragraph (1-2 sentences) in journalistic style, focusing on key developments without redundancy"
+                    },
+                    "key_points": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "3-5 concise bullet points with unique insights or takeaways (avoid repetition)"
+                    },
+                    "sources": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Sources referenced"
+                    }
+                },
+                "required": ["topic", "brief", "key_points", "sources"]
+            }
+        }
+    },
+    "required": ["overall_headline", "tldr", "is_relevant", "topic_summaries"]
+})
+
+SOURCE_RESPONSE_SCHEMA = types.Schema.model_validate({
+    "type": "object",
+    "properties": {
+        "overall_headline": {
+            "type": "string",
+            "description": "Compelling main headline that captures the most significant news across all sources"
+        },
+        "tldr": {
+            "type": "string",
+            "description": "Concise 2-3 sentence summary capturing the essence of all major developments"
+        },
+        "source_summaries": {
+            "type": "array",
+            "description": "Array of summaries for each source with unique, non-duplicated content",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "source": {"type": "string"},
+                    "brief": {
+                        "type": "string",
+                        "description": "Concise paragraph focusing on unique content from this source only"
+                    },
+                    "key_points": {
+                        "type": "array",
+                        "description": "3-5 unique insights exclusive to this source (no duplication across sources)",
+                        "items": {"type": "string"}
+                    },
+                    "themes": {
+                        "type": "array",
+                        "description": "2-3 main themes unique to this source's coverage",
+                        "items": {"type": "string"}
+                    }
+                },
+                "required": ["source", "brief", "key_points", "themes"]
+            }
+        }
+    },
+    "required": ["overall_headline", "tldr", "source_summaries"]
+})
+
+
 async def _generate_summary_async(
     client: genai.Client, 
     relevant_topics: Dict[str, List[FilteredMessage]],
@@ -677,55 +815,12 @@ async def _generate_summary_async(
     user_stats: Optional[object] = None,
     time_analysis: Optional[Dict] = None
 ) -> str:
-    response_schema = {
-        "type": "object",
-        "properties": {
-            "overall_headline": {
-                "type": "string",
-                "description": "Compelling main headline that captures the most significant news across all topics"
-            },
-            "tldr": {
-                "type": "string",
-                "description": "Concise 2-3 sentence summary capturing the essence of all major developments"
-            },
-            "is_relevant": {
-                "type": "boolean",
-                "description": "Whether there is truly valuable, non-redundant information matching any user interests"
-            },
-            "topic_summaries": {
-                "type": "array",
-                "description": "Array of summaries for each relevant topic (empty if not relevant)",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "topic": {"type": "string"},
-                        "brief": {
-                            "type": "string",
-                            "description": "Concise, engaging paragraph (1-2 sentences) in journalistic style, focusing on key developments without redundancy"
-                        },
-                        "key_points": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "3-5 concise bullet points with unique insights or takeaways (avoid repetition)"
-                        },
-                        "sources": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Sources referenced"
-                        }
-                    },
-                    "required": ["topic", "brief", "key_points", "sources"]
-                }
-            }
-        },
-        "required": ["overall_headline", "tldr", "is_relevant", "topic_summaries"]
-    }
     extra_context = {"user_topics": user_topics, "user_stats": user_stats, "time_analysis": time_analysis}
     return await _generate_summary_generic(
         client,
         relevant_topics,
         user_language,
-        response_schema,
+        TOPIC_RESPONSE_SCHEMA,
         _build_topic_prompt,
         _format_topic_result,
         extra_context,
@@ -739,51 +834,12 @@ async def _generate_summary_without_topics_async(
     user_stats: Optional[object] = None,
     time_analysis: Optional[Dict] = None
 ) -> str:
-    response_schema = {
-        "type": "object",
-        "properties": {
-            "overall_headline": {
-                "type": "string",
-                "description": "Compelling main headline that captures the most significant news across all sources"
-            },
-            "tldr": {
-                "type": "string",
-                "description": "Concise 2-3 sentence summary capturing the essence of all major developments"
-            },
-            "source_summaries": {
-                "type": "array",
-                "description": "Array of summaries for each source with unique, non-duplicated content",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "source": {"type": "string"},
-                        "brief": {
-                            "type": "string",
-                            "description": "Concise paragraph focusing on unique content from this source only"
-                        },
-                        "key_points": {
-                            "type": "array",
-                            "description": "3-5 unique insights exclusive to this source (no duplication across sources)",
-                            "items": {"type": "string"}
-                        },
-                        "themes": {
-                            "type": "array",
-                            "description": "2-3 main themes unique to this source's coverage",
-                            "items": {"type": "string"}
-                        }
-                    },
-                    "required": ["source", "brief", "key_points", "themes"]
-                }
-            }
-        },
-        "required": ["overall_headline", "tldr", "source_summaries"]
-    }
     extra_context = {"user_stats": user_stats, "time_analysis": time_analysis}
     return await _generate_summary_generic(
         client,
         relevant_sources,
         user_language,
-        response_schema,
+        SOURCE_RESPONSE_SCHEMA,
         _build_source_prompt,
         _format_source_result,
         extra_context,
@@ -815,3 +871,33 @@ def get_user_summaries(
             query = query.filter(Summary.topic == topic)
             
         return query.all()
+
+
+def get_user_summaries_bulk(
+    user_ids: List[int],
+    days_back: int = 1,
+) -> Dict[int, Summary]:
+    """
+    Get the most recent summary for each of the given users in a single query.
+    """
+    if not user_ids:
+        return {}
+    
+    with SessionLocal() as session:
+        now = datetime.now(timezone.utc)
+        date_threshold = (now - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        summaries = (
+            session.query(Summary)
+            .filter(
+                Summary.user_id.in_(user_ids),
+                Summary.created_at >= date_threshold
+            )
+            .order_by(Summary.created_at.desc())
+            .all()
+        )
+        
+        latest_by_user: Dict[int, Summary] = {}
+        for summary in summaries:
+            latest_by_user.setdefault(summary.user_id, summary)
+        return latest_by_user
@@ -1,6 +1,7 @@
 import os
+import asyncio
 import logging
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -15,6 +16,13 @@ logger = logging.getLogger(__name__)
 OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Pending embed() calls are coalesced into one request of up to this many texts,
+# waiting at most EMBED_COALESCE_DELAY seconds for more to arrive
+EMBED_COALESCE_MAX_TEXTS = 64
+EMBED_COALESCE_DELAY = 0.05
+# Coalesced requests sent to OpenAI at the same time; while all are busy new calls keep coalescing
+EMBED_MAX_IN_FLIGHT = 4
+
 _openai_client: Optional[OpenAI] = None
 
 
@@ -85,4 +93,90 @@ def get_embedder_info() -> dict:
         "embedder_type": "openai",
         "model_name": OPENAI_EMBEDDING_MODEL,
         "dimension": get_embedding_dimension(),
-    }
\ No newline at end of file
+    }
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into shared get_embeddings calls."""
+
+    def __init__(
+        self,
+        max_texts: int = EMBED_COALESCE_MAX_TEXTS,
+        max_delay: float = EMBED_COALESCE_DELAY,
+        max_in_flight: int = EMBED_MAX_IN_FLIGHT,
+    ):
+        self.max_texts = max_texts
+        self.max_delay = max_delay
+        self._queue: "asyncio.Queue[Tuple[List[str], asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts like get_embeddings, sharing the underlying request with other callers."""
+        filtered_texts = [text.strip() for text in texts if text and text.strip()]
+        if not filtered_texts:
+            return []
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((filtered_texts, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            total = len(pending[0][0])
+            deadline = loop.time() + self.max_delay
+            while total < self.max_texts:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                total += len(item[0])
+
+            # Each request runs as its own task so the worker can keep coalescing the next one
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._dispatch(pending))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, pending: List[Tuple[List[str], asyncio.Future]]) -> None:
+        try:
+            all_texts = [text for texts, _ in pending for text in texts]
+            try:
+                vectors = await asyncio.to_thread(get_embeddings, all_texts)
+                if len(vectors) != len(all_texts):
+                    raise ValueError(f"Expected {len(all_texts)} embeddings, got {len(vectors)}")
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            offset = 0
+            for texts, future in pending:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+        finally:
+            self._in_flight.release()
+
+
+_batcher: Optional[EmbeddingBatcher] = None
+_batcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Return the batcher for the running event loop, creating it on first use."""
+    global _batcher, _batcher_loop
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher_loop is not loop:
+        _batcher = EmbeddingBatcher()
+        _batcher_loop = loop
+    return _batcher
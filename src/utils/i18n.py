@@ -1,5 +1,6 @@
 from typing import Dict, Optional
 from enum import Enum
+from functools import lru_cache
 
 
 class Language(Enum):
@@ -367,6 +368,15 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
 }
 
 
+LANGUAGE_BY_CODE: Dict[str, Language] = {language.value: language for language in Language}
+
+
+def language_from_code(code: Optional[str]) -> Language:
+    """Map a stored language code to a Language, falling back to English."""
+    return LANGUAGE_BY_CODE.get(code, Language.ENGLISH)
+
+
+@lru_cache(maxsize=64)
 def detect_user_language(language_code: Optional[str]) -> Language:
     """
     Detect user's preferred language based on Telegram's language_code
@@ -382,6 +392,23 @@ def detect_user_language(language_code: Optional[str]) -> Language:
         return Language.ENGLISH
 
 
+@lru_cache(maxsize=4096)
+def _get_text_raw(key: str, language: Language) -> str:
+    """Return the unformatted translation template for a key and language."""
+    translations = TRANSLATIONS.get(language.value, TRANSLATIONS[Language.ENGLISH.value])
+    return translations.get(key, f"[Missing: {key}]")
+
+
+@lru_cache(maxsize=1024)
+def _get_text_formatted(key: str, language: Language, format_items: tuple) -> str:
+    """Return a translation formatted with the given (name, value) pairs."""
+    text = _get_text_raw(key, language)
+    try:
+        return text.format(**dict(format_items))
+    except KeyError:
+        return text
+
+
 def get_text(key: str, language: Language, **kwargs) -> str:
     """
     Get translated text for a given key and language.
@@ -394,14 +421,15 @@ def get_text(key: str, language: Language, **kwargs) -> str:
     Returns:
         Translated and formatted text
     """
-    lang_code = language.value
-    translations = TRANSLATIONS.get(lang_code, TRANSLATIONS[Language.ENGLISH.value])
-    text = translations.get(key, f"[Missing: {key}]")
+    if not kwargs:
+        return _get_text_raw(key, language)
     
-    if kwargs:
+    try:
+        return _get_text_formatted(key, language, tuple(sorted(kwargs.items())))
+    except TypeError:
+        # Unhashable format arguments cannot be memoized
+        text = _get_text_raw(key, language)
         try:
             return text.format(**kwargs)
         except KeyError:
             return text
-    
-    return text
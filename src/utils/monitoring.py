@@ -1,7 +1,8 @@
 import os
+import asyncio
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Awaitable, Callable, Optional, Dict, Any, Tuple
 from html import escape
 from telegram import Bot
 from telegram.error import TelegramError
@@ -18,6 +19,82 @@ class Notifier:
         
         if not self.admin_chat_id:
             logger.warning("ADMIN_CHAT_ID not set - monitoring notifications disabled")
+        
+        # (label for logging, call that sends the notification)
+        self._queue: Optional[asyncio.Queue[Tuple[str, Callable[[], Awaitable[None]]]]] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def _enqueue(self, label: str, send: Callable[[], Awaitable[None]]) -> None:
+        if not self.admin_chat_id:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain_queue())
+        self._queue.put_nowait((label, send))
+    
+    def queue_system_performance(self, event_type: str, details: Dict[str, Any]) -> None:
+        """Queue a system performance notification to be sent in the background."""
+        self._enqueue(event_type, lambda: self.notify_system_performance(event_type, details))
+    
+    def queue_new_user(self, username: str, telegram_id: int, user_count: int) -> None:
+        """Queue a new user notification to be sent in the background."""
+        self._enqueue("new_user", lambda: self.notify_new_user(username, telegram_id, user_count))
+    
+    def queue_user_activity(self, username: str, activity_type: str, details: Dict[str, Any]) -> None:
+        """Queue a user activity notification to be sent in the background."""
+        self._enqueue(activity_type, lambda: self.notify_user_activity(username, activity_type, details))
+    
+    def queue_collection_results(
+        self,
+        collection_duration: float,
+        collected_total: int,
+        collected_stats: Dict[str, Any],
+        filtering_duration: float,
+        filter_result: Dict[str, Any],
+        **extra: Any,
+    ) -> None:
+        """Queue the collection and filtering completion notifications."""
+        self.queue_system_performance("collection_completed", {
+            "duration": round(collection_duration, 2),
+            "messages_collected": collected_total,
+            "messages_processed": collected_stats.get("messages_processed", "N/A"),
+            "skipped_empty": collected_stats.get("skipped_empty", "N/A"),
+            "skipped_old": collected_stats.get("skipped_old", "N/A"),
+            **extra,
+        })
+        self.queue_system_performance("filtering_completed", {
+            "duration": round(filtering_duration, 2),
+            "filtered_messages": filter_result.get("messages_filtered", "N/A"),
+            "users_processed": filter_result.get("users_processed", "N/A"),
+            "topics_matched": filter_result.get("topics_matched", "N/A"),
+            **extra,
+        })
+    
+    async def flush(self) -> None:
+        """Wait until all queued notifications have been sent."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+    
+    async def close(self) -> None:
+        """Stop the background worker; call flush() first to send what is still queued."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+    
+    async def _drain_queue(self) -> None:
+        while True:
+            label, send = await self._queue.get()
+            try:
+                await send()
+            except Exception as e:
+                logger.error(f"Failed to send queued notification '{label}': {e}")
+            finally:
+                self._queue.task_done()
     
     async def _send_notification(self, message: str, parse_mode: str = 'HTML') -> bool:
         """Send a notification message to the admin chat."""
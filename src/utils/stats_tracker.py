@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
 import time
 
@@ -165,6 +165,22 @@ def get_user_stats(user_id: int, days_back: int = 1) -> Optional[ProcessingStats
         return stats
 
 
+def get_user_stats_bulk(user_ids: List[int], days_back: int = 1) -> Dict[int, ProcessingStats]:
+    """Get the most recent processing statistics for many users in one query"""
+    if not user_ids:
+        return {}
+    
+    target_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    with SessionLocal() as session:
+        stats = session.query(ProcessingStats).filter(
+            ProcessingStats.user_id.in_(user_ids),
+            ProcessingStats.date == target_date
+        ).all()
+        
+        return {s.user_id: s for s in stats}
+
+
 def calculate_time_saved(stats: ProcessingStats) -> Dict[str, Any]:
     """Calculate estimated time saved based on processing statistics"""
     avg_words_per_message = 50
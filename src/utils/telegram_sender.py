@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from telegram import Bot
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly 30 messages per second across all chats for a bot
+MAX_MESSAGES_PER_SECOND = 30
+MAX_CONCURRENT_SENDS = 25
+MAX_SEND_RETRIES = 3
+# Telegram asks bots to keep to about one message per second within a single chat
+PER_CHAT_MIN_INTERVAL = 1.0
+
+
+class AsyncRateLimiter:
+    """Token bucket limiting how many operations may start per period."""
+
+    def __init__(self, rate: int, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._tokens = min(float(self.rate), self._tokens + elapsed * self.rate / self.period)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
+_rate_limiter = AsyncRateLimiter(MAX_MESSAGES_PER_SECOND)
+_send_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+# Per-chat state only lives while a chat is inside its PER_CHAT_MIN_INTERVAL; see _prune_chat_state
+_chat_locks: Dict[int, asyncio.Lock] = {}
+_chat_last_sent: Dict[int, float] = {}
+
+
+def _prune_chat_state() -> None:
+    """Drop state for chats past their interval whose lock is free, so only recently messaged chats are kept."""
+    cutoff = time.monotonic() - PER_CHAT_MIN_INTERVAL
+    # A chat with a waiter was stamped by the sender that just released its lock, so it is never past the cutoff
+    for chat_id in [chat_id for chat_id, sent in _chat_last_sent.items() if sent <= cutoff]:
+        lock = _chat_locks.get(chat_id)
+        if lock is None or not lock.locked():
+            del _chat_last_sent[chat_id]
+            _chat_locks.pop(chat_id, None)
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    delay = error.retry_after
+    if isinstance(delay, timedelta):
+        return delay.total_seconds()
+    return float(delay)
+
+
+async def send_message_limited(
+    bot: Bot,
+    chat_id: int,
+    text: str,
+    parse_mode: Optional[str] = None,
+    max_retries: int = MAX_SEND_RETRIES,
+) -> None:
+    """Send a message respecting the global and per-chat rate limits, retrying on flood control.
+
+    Errors other than RetryAfter are raised to the caller unchanged.
+    """
+    _prune_chat_state()
+    lock = _chat_locks.setdefault(chat_id, asyncio.Lock())
+    async with lock:
+        wait = _chat_last_sent.get(chat_id, 0.0) + PER_CHAT_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            await _send_with_retries(bot, chat_id, text, parse_mode, max_retries)
+        finally:
+            _chat_last_sent[chat_id] = time.monotonic()
+
+
+async def _send_with_retries(
+    bot: Bot,
+    chat_id: int,
+    text: str,
+    parse_mode: Optional[str],
+    max_retries: int,
+) -> None:
+    attempt = 0
+    while True:
+        async with _send_semaphore:
+            await _rate_limiter.acquire()
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                return
+            except RetryAfter as e:
+                attempt += 1
+                if attempt > max_retries:
+                    raise
+                delay = _retry_after_seconds(e)
+        logger.warning(f"Flood control for chat {chat_id}, retrying in {delay}s (attempt {attempt}/{max_retries})")
+        await asyncio.sleep(delay)
@@ -1,5 +1,6 @@
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
 
 MAX_TEXT_LENGTH = 2000 # 2000 chars (~500 tokens)
 
@@ -113,4 +114,9 @@ def split_text_safely(text: str, max_chunk_size: int = 4096) -> List[str]:
     if current_chunk:
         chunks.append(current_chunk.strip())
     
-    return chunks 
\ No newline at end of file
+    return chunks 
+
+@lru_cache(maxsize=256)
+def split_text_cached(text: str, max_chunk_size: int = 4096) -> Tuple[str, ...]:
+    """Memoized split_text_safely, so a summary shared by many users is split only once."""
+    return tuple(split_text_safely(text, max_chunk_size))